@@ -0,0 +1,184 @@
+"""Run !monday prompts from a JSONL file through the normal completion pipeline.
+
+Each input line is a JSON object with a ``message`` (or ``prompt``) and
+optionally an ``id``, a ``user`` display name and a ``mood``. Results are
+appended to the output file as they finish, which doubles as the
+checkpoint: re-running with the same output skips every id that already
+has a reply.
+
+    python batch.py prompts.jsonl replies.jsonl --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+
+from log_pipeline import setup_logging
+from monday.config import PROFILES, load_config
+from monday.personality import user_prompt
+from monday.services import Services
+from prompts import create_prompt_builder
+from response_cache import can_depersonalize, depersonalize, make_cache_key, make_cache_scope
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+
+DEFAULT_CONCURRENCY = 8
+# Prompts without a user stay anonymous, and their replies are cached as they are
+DEFAULT_USER = "someone"
+DEFAULT_MOOD = "sarcastic"
+
+# =============================================================================
+# INPUT / OUTPUT
+# =============================================================================
+
+def read_prompts(path):
+    """Yield (id, record) for every prompt line; ids default to the line number"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"Skipping line {line_number}: {e}")
+                continue
+            if not (record.get("message") or record.get("prompt")):
+                logger.warning(f"Skipping line {line_number}: no message")
+                continue
+            yield str(record.get("id", line_number)), record
+
+
+def load_checkpoint(path):
+    """Ids that already have a successful reply in the output file"""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by a crash; that prompt simply runs again
+                continue
+            if "reply" in result:
+                done.add(str(result["id"]))
+    return done
+
+# =============================================================================
+# PIPELINE
+# =============================================================================
+
+def record_mood(services, record):
+    """The record's mood, falling back to the default one when the mood cog is on"""
+    if services.cog_enabled("mood"):
+        return record.get("mood", DEFAULT_MOOD)
+    return record.get("mood")
+
+
+def build_prompt(prompt_builder, services, record):
+    """The same messages !monday would send for a message with no history"""
+    mood = record_mood(services, record)
+    return prompt_builder.build(
+        user_prompt(record.get("user", DEFAULT_USER), record.get("message") or record.get("prompt")),
+        context=f"Current mood: {mood}" if mood else None
+    )
+
+
+async def run_batch(services, input_path, output_path, concurrency, response_cache=None, semantic_cache=None):
+    """Run every pending prompt with at most ``concurrency`` requests in flight"""
+    settings = services.settings
+    # No conversation memory or state store: batch runs don't touch the bot's counters
+    prompt_builder = create_prompt_builder(services.system_prompt, settings)
+    done = load_checkpoint(output_path)
+    if done:
+        logger.info(f"Resuming: {len(done)} prompts already answered")
+
+    prompts = ((prompt_id, record) for prompt_id, record in read_prompts(input_path) if prompt_id not in done)
+    counts = {"ok": 0, "error": 0}
+    started = time.perf_counter()
+
+    with open(output_path, "a", encoding="utf-8") as out:
+        async def worker():
+            # Workers pull from one shared generator, so the input is never loaded whole
+            for prompt_id, record in prompts:
+                result = {"id": prompt_id, "message": record.get("message") or record.get("prompt")}
+                try:
+                    prompt = build_prompt(prompt_builder, services, record)
+                    completion = await services.model_router.complete(
+                        prompt.messages,
+                        command="batch",
+                        max_tokens=prompt.max_tokens,
+                        temperature=settings.get("temperature", 0.8)
+                    )
+                    result.update(
+                        reply=completion.text, model=completion.model, latency=round(completion.latency, 3),
+                        tokens=prompt_builder.record_usage(prompt, usage=completion.usage, reply_text=completion.text)
+                    )
+                    counts["ok"] += 1
+                    # Same key as !monday uses: per mood when the mood cog is on
+                    mood = record_mood(services, record)
+                    user = record.get("user")
+                    if (services.cog_enabled("mood") or not mood) and (user is None or can_depersonalize(user)):
+                        model = settings.get("default_model", "gpt-4")
+                        extra = (mood,) if services.cog_enabled("mood") else ()
+                        reply = completion.text if user is None else depersonalize(completion.text, user)
+                        if response_cache is not None:
+                            key = make_cache_key(result["message"], model, settings, services.system_prompt, extra=extra)
+                            response_cache.set(key, reply)
+                        if semantic_cache is not None:
+                            scope = make_cache_scope(model, settings, services.system_prompt, extra=extra)
+                            semantic_cache.set(result["message"], scope, reply)
+                except Exception as e:
+                    result["error"] = f"{type(e).__name__}: {e}"
+                    counts["error"] += 1
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+
+                total = counts["ok"] + counts["error"]
+                if total % 100 == 0:
+                    rate = total / (time.perf_counter() - started)
+                    logger.info(f"{total} prompts done ({counts['error']} errors, {rate:.1f}/s)")
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    logger.info(f"Batch finished: {counts['ok']} replies, {counts['error']} errors "
+                f"in {time.perf_counter() - started:.1f}s")
+    return counts
+
+
+def main():
+    log_handler = setup_logging()
+    parser = argparse.ArgumentParser(description="Run Monday prompts from a JSONL file without Discord")
+    parser.add_argument("input", help="JSONL file of prompts")
+    parser.add_argument("output", help="JSONL file for replies (also the resume checkpoint)")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="requests in flight (default: max_concurrent_requests)")
+    parser.add_argument("--pipeline", choices=sorted(PROFILES), default="bot",
+                        help="which profile's prompt and settings to use")
+    parser.add_argument("--fill-cache", action="store_true",
+                        help="store replies in the response and semantic caches "
+                             "(set cache_path and semantic_cache_path to keep them)")
+    args = parser.parse_args()
+
+    services = Services(load_config(args.pipeline))
+    log_handler.configure(services.settings)
+    if services.model_router is None:
+        logger.error("No OpenAI API key found. Please set OPENAI_API_KEY environment variable.")
+        raise SystemExit(1)
+
+    concurrency = args.concurrency or services.settings.get("max_concurrent_requests", DEFAULT_CONCURRENCY)
+    response_cache = services.response_cache if args.fill_cache else None
+    semantic_cache = services.semantic_cache if args.fill_cache else None
+    counts = asyncio.run(run_batch(services, args.input, args.output, concurrency, response_cache, semantic_cache))
+    raise SystemExit(1 if counts["error"] else 0)
+
+
+if __name__ == "__main__":
+    main()
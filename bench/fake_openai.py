@@ -0,0 +1,192 @@
+"""A local stand-in for the OpenAI chat completions API, for load tests.
+
+Run on its own with ``python -m bench.fake_openai --port 8089`` and point
+the bot at it with ``OPENAI_BASE_URL=http://127.0.0.1:8089/v1``.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+
+DEFAULT_PORT = 8089
+DEFAULT_LATENCY_MEDIAN = 0.8
+DEFAULT_LATENCY_SIGMA = 0.5
+DEFAULT_ERROR_RATE = 0.0
+DEFAULT_RATE_LIMIT_RATE = 0.0
+DEFAULT_STREAM_CHUNKS = 20
+
+REPLY_WORDS = (
+    "Oh joy, another human problem. Let me guess, you tried turning it off and on again "
+    "and it somehow did not fix your life choices. Fine. Here is the answer you could have "
+    "found yourself in about four seconds of searching."
+).split()
+
+# =============================================================================
+# FAKE SERVER
+# =============================================================================
+
+class FakeOpenAI:
+    """Serves /v1/chat/completions with configurable latency and failures.
+
+    Latency is log-normal around ``latency_median``. A fraction
+    ``error_rate`` of requests fail with a 500 and ``rate_limit_rate`` with
+    a 429 carrying a ``retry-after`` header.
+    """
+
+    def __init__(self, latency_median=DEFAULT_LATENCY_MEDIAN, latency_sigma=DEFAULT_LATENCY_SIGMA,
+                 error_rate=DEFAULT_ERROR_RATE, rate_limit_rate=DEFAULT_RATE_LIMIT_RATE,
+                 stream_chunks=DEFAULT_STREAM_CHUNKS, seed=None):
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.stream_chunks = stream_chunks
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.failures = 0
+        self._runner = None
+
+    def sample_latency(self):
+        return self.latency_median * self.random.lognormvariate(0, self.latency_sigma)
+
+    async def handle_chat(self, request):
+        self.requests += 1
+        body = await request.json()
+        model = body.get("model", "gpt-4")
+        latency = self.sample_latency()
+
+        roll = self.random.random()
+        if roll < self.rate_limit_rate:
+            self.failures += 1
+            await asyncio.sleep(latency / 10)
+            return _error(429, "Rate limit reached", {"retry-after": "1"})
+        if roll < self.rate_limit_rate + self.error_rate:
+            self.failures += 1
+            await asyncio.sleep(latency)
+            return _error(500, "The server had an error while processing your request")
+
+        words = REPLY_WORDS[:self.random.randint(10, len(REPLY_WORDS))]
+        prompt_tokens = sum(len(message.get("content", "")) for message in body.get("messages", [])) // 4
+        if body.get("stream"):
+            include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+            return await self._stream(request, model, words, latency, prompt_tokens if include_usage else None)
+
+        await asyncio.sleep(latency)
+        return web.json_response({
+            "id": f"chatcmpl-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": " ".join(words)},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(words),
+                "total_tokens": prompt_tokens + len(words)
+            }
+        })
+
+    async def _stream(self, request, model, words, latency, prompt_tokens=None):
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        chunk_size = max(1, len(words) // self.stream_chunks)
+        pieces = [words[i:i + chunk_size] for i in range(0, len(words), chunk_size)]
+        for index, piece in enumerate(pieces):
+            await asyncio.sleep(latency / len(pieces))
+            text = (" " if index else "") + " ".join(piece)
+            chunk = {
+                "id": f"chatcmpl-{self.requests}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}]
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        if prompt_tokens is not None:
+            # What OpenAI sends last for stream_options={"include_usage": true}
+            chunk = {
+                "id": f"chatcmpl-{self.requests}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(words),
+                    "total_tokens": prompt_tokens + len(words)
+                }
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def start(self, host="127.0.0.1", port=DEFAULT_PORT):
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self.handle_chat)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info(f"Fake OpenAI listening on http://{host}:{port}/v1")
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+
+def _error(status, message, headers=None):
+    return web.json_response(
+        {"error": {"message": message, "type": "server_error", "code": None}},
+        status=status,
+        headers=headers
+    )
+
+
+def add_arguments(parser):
+    """Fake server options, shared with the load test"""
+    parser.add_argument("--latency-median", type=float, default=DEFAULT_LATENCY_MEDIAN,
+                        help="median completion latency in seconds")
+    parser.add_argument("--latency-sigma", type=float, default=DEFAULT_LATENCY_SIGMA,
+                        help="log-normal spread of completion latency")
+    parser.add_argument("--error-rate", type=float, default=DEFAULT_ERROR_RATE,
+                        help="fraction of requests that fail with a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=DEFAULT_RATE_LIMIT_RATE,
+                        help="fraction of requests that fail with a 429")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def from_args(args):
+    return FakeOpenAI(
+        latency_median=args.latency_median,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed
+    )
+
+
+async def serve_forever(server, port):
+    await server.start(port=port)
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Fake OpenAI server for load testing Monday")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    add_arguments(parser)
+    args = parser.parse_args()
+    asyncio.run(serve_forever(from_args(args), args.port))
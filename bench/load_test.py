@@ -0,0 +1,295 @@
+"""Offline load test for the Monday bot.
+
+Drives the bot's commands through synthetic contexts against a local
+fake OpenAI server, so no Discord or OpenAI account is needed:
+
+    python -m bench.load_test --concurrency 1 8 32 --requests 200
+"""
+import argparse
+import asyncio
+import atexit
+import json
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from bench.fake_openai import add_arguments, from_args
+from monday.app import create_app
+from monday.config import PROFILES, load_config
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+
+DEFAULT_CONCURRENCY = [1, 8, 32]
+DEFAULT_REQUESTS = 200
+DEFAULT_PORT = 8090
+DEFAULT_COMMAND_MIX = {"monday": 0.7, "roast": 0.1, "motivation": 0.1, "status": 0.1}
+DEFAULT_DISCORD_LATENCY = 0.02
+STALL_PROBE_INTERVAL = 0.01
+STALL_THRESHOLD = 0.05
+
+PROMPTS = [
+    "how do I center a div",
+    "why is my python script so slow",
+    "explain recursion like I'm five",
+    "what should I have for lunch",
+    "is tabs or spaces better",
+    "help me name my cat",
+    "what's the meaning of life",
+    "fix my regex please",
+]
+
+# =============================================================================
+# SYNTHETIC DISCORD OBJECTS
+# =============================================================================
+
+class FakePermissions:
+    administrator = False
+
+
+class FakeUser:
+    def __init__(self, user_id):
+        self.id = user_id
+        self.display_name = f"user{user_id}"
+        self.guild_permissions = FakePermissions()
+
+
+class FakeGuild:
+    def __init__(self, guild_id):
+        self.id = guild_id
+
+
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+
+
+class FakeMessage:
+    def __init__(self, content, latency):
+        self.content = content
+        self.latency = latency
+        self.edits = 0
+
+    async def edit(self, content=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        self.content = content
+        self.edits += 1
+
+    async def delete(self):
+        await asyncio.sleep(self.latency)
+
+
+class FakeContext:
+    """Just enough of commands.Context for the bot's command callbacks"""
+
+    def __init__(self, user_id, guild_id, channel_id, latency):
+        self.author = FakeUser(user_id)
+        self.guild = FakeGuild(guild_id)
+        self.channel = FakeChannel(channel_id)
+        self.latency = latency
+        self.replies = []
+
+    async def reply(self, content=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        message = FakeMessage(content, self.latency)
+        self.replies.append(message)
+        return message
+
+    send = reply
+
+# =============================================================================
+# MEASUREMENT
+# =============================================================================
+
+class StallMonitor:
+    """Measures how long the event loop is unable to run a tiny periodic task"""
+
+    def __init__(self, interval=STALL_PROBE_INTERVAL, threshold=STALL_THRESHOLD):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_lag = 0.0
+        self.stall_time = 0.0
+        self.stalls = 0
+        self._task = None
+
+    async def _probe(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = loop.time() - expected
+            self.max_lag = max(self.max_lag, lag)
+            if lag > self.threshold:
+                self.stalls += 1
+                self.stall_time += lag
+
+    def start(self):
+        self._task = asyncio.create_task(self._probe())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+# =============================================================================
+# LOAD TEST
+# =============================================================================
+
+async def invoke(bot, name, ctx, **kwargs):
+    """Call a cog command's callback directly, skipping Discord's parsing"""
+    command = bot.get_command(name)
+    await command.callback(command.cog, ctx, **kwargs)
+
+
+async def run_command(bot, name, index, discord_latency, rng):
+    ctx = FakeContext(
+        user_id=rng.randint(1, 10000),
+        guild_id=rng.randint(1, 50),
+        channel_id=rng.randint(1, 500),
+        latency=discord_latency
+    )
+    if name == "monday":
+        # A unique suffix keeps the response cache from answering everything
+        await invoke(bot, "monday", ctx, message=f"{rng.choice(PROMPTS)} #{index}")
+    elif name == "roast":
+        await invoke(bot, "roast", ctx, member=None)
+    else:
+        await invoke(bot, name, ctx)
+    return ctx
+
+
+def command_errors(names):
+    """Failures the commands caught and reported themselves, once per command.
+
+    Only ``command:<name>`` errors count: an OpenAI call that succeeded on
+    a retry also records an error per failed attempt, but the command
+    itself went fine.
+    """
+    from metrics import ERRORS
+    return sum(ERRORS.total(where=f"command:{name}") for name in names)
+
+
+async def run_level(bot, concurrency, total, mix, discord_latency, seed):
+    """Run ``total`` commands with at most ``concurrency`` in flight"""
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latencies = {name: [] for name in names}
+    errors_before = command_errors(names)
+    failures = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    monitor = StallMonitor()
+
+    async def one(index):
+        nonlocal failures
+        name = rng.choices(names, weights)[0]
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await run_command(bot, name, index, discord_latency, rng)
+            except Exception:
+                failures += 1
+            latencies[name].append(time.perf_counter() - start)
+
+    monitor.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(total)))
+    elapsed = time.perf_counter() - start
+    await monitor.stop()
+
+    everything = [value for values in latencies.values() for value in values]
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "elapsed": elapsed,
+        "commands_per_sec": total / elapsed if elapsed else 0.0,
+        "p50": percentile(everything, 50),
+        "p95": percentile(everything, 95),
+        "p99": percentile(everything, 99),
+        "errors": failures + command_errors(names) - errors_before,
+        "loop_max_lag": monitor.max_lag,
+        "loop_stall_time": monitor.stall_time,
+        "loop_stalls": monitor.stalls,
+        "per_command": {
+            name: {"count": len(values), "p50": percentile(values, 50), "p95": percentile(values, 95)}
+            for name, values in latencies.items() if values
+        }
+    }
+
+
+def print_report(results):
+    print(f"{'conc':>5} {'cmd/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7} {'max lag':>8} {'stalled':>8}")
+    for result in results:
+        print(
+            f"{result['concurrency']:>5} {result['commands_per_sec']:>8.1f} "
+            f"{result['p50']:>7.3f}s {result['p95']:>7.3f}s {result['p99']:>7.3f}s "
+            f"{result['errors']:>7} {result['loop_max_lag']:>7.3f}s {result['loop_stall_time']:>7.3f}s"
+        )
+
+
+async def main(args):
+    fake = from_args(args)
+    await fake.start(port=args.port)
+
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    # Fake traffic must not reach the real counters, token budgets, caches or metrics.
+    # Registered before the stores' own atexit hooks, so it runs after they close.
+    scratch = tempfile.mkdtemp(prefix="monday-load-test-")
+    atexit.register(shutil.rmtree, scratch, ignore_errors=True)
+    os.environ["STATE_PATH"] = os.path.join(scratch, "state.db")
+    for name in ("CACHE_PATH", "SEMANTIC_CACHE_PATH", "METRICS_PORT"):
+        os.environ.pop(name, None)
+    config = load_config(args.profile)
+    config.update(discord_token="load-test", openai_api_key="load-test")
+    # Unset variables leave config.json's own paths in place, so clear those too
+    config["bot_settings"].update(cache_path=None, semantic_cache_path=None, metrics_port=None)
+    config["bot_settings"]["stream_replies"] = args.stream
+    bot = create_app(args.profile, config)
+    # Cogs normally load when the bot logs in
+    await bot.setup_hook()
+
+    results = []
+    try:
+        for concurrency in args.concurrency:
+            result = await run_level(
+                bot, concurrency, args.requests, DEFAULT_COMMAND_MIX, args.discord_latency, args.seed
+            )
+            results.append(result)
+    finally:
+        await fake.stop()
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline load test for the Monday bot")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="commands per concurrency level")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port for the fake OpenAI server")
+    parser.add_argument("--discord-latency", type=float, default=DEFAULT_DISCORD_LATENCY,
+                        help="simulated seconds per Discord reply or edit")
+    parser.add_argument("--stream", action="store_true", help="exercise streaming replies")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="bot", help="which cogs and settings to load")
+    parser.add_argument("--json", help="also write results to this file")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    asyncio.run(main(args))
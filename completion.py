@@ -0,0 +1,252 @@
+import asyncio
+import logging
+import time
+
+import httpx
+from openai import AsyncOpenAI
+
+from metrics import record_completion, record_error, record_retry
+from resilience import (
+    DEFAULT_BASE_DELAY, DEFAULT_FAILURE_THRESHOLD, DEFAULT_MAX_ATTEMPTS, DEFAULT_MAX_DELAY,
+    DEFAULT_RECOVERY_TIME, CircuitBreaker, RateLimitPacer, RateLimitPaused, RetryPolicy, classify_error,
+    error_headers, parse_retry_after
+)
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+
+DEFAULT_MAX_CONCURRENT_REQUESTS = 8
+DEFAULT_REQUEST_TIMEOUT = 30.0
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_MAX_CONNECTIONS = 20
+
+# =============================================================================
+# COMPLETION CLIENT
+# =============================================================================
+
+class CompletionResult:
+    """The reply text of one chat completion plus some bookkeeping"""
+
+    def __init__(self, text, model, latency, usage=None):
+        self.text = text
+        self.model = model
+        self.latency = latency
+        self.usage = usage
+
+    def __repr__(self):
+        return f"CompletionResult(model={self.model!r}, latency={self.latency:.3f}s)"
+
+
+class CompletionClient:
+    """Async chat completions sharing one pooled HTTP connection.
+
+    At most ``max_concurrent_requests`` completions are in flight at once;
+    everything beyond that waits its turn on a semaphore instead of
+    blocking the event loop. ``request_timeout`` bounds the whole request,
+    including the time spent waiting for a free slot and any retries.
+
+    Failures go through ``resilience.py``: transient ones are retried with
+    jittered backoff, rate limit headers pause every caller at once, and a
+    circuit breaker fails fast with CircuitOpen while OpenAI is down.
+    A rate limit pause that would outlast the deadline fails fast with
+    RateLimitPaused instead, without counting as an outage.
+    """
+
+    def __init__(self, api_key, max_concurrent_requests=DEFAULT_MAX_CONCURRENT_REQUESTS,
+                 request_timeout=DEFAULT_REQUEST_TIMEOUT, max_connections=DEFAULT_MAX_CONNECTIONS,
+                 base_url=None, retry_policy=None, breaker=None):
+        self.request_timeout = request_timeout
+        self.max_concurrent_requests = max_concurrent_requests
+        self.in_flight = 0
+        self.retries = 0
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.pacer = RateLimitPacer()
+
+        # One connection pool for every request, so TLS handshakes are reused
+        self._http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            timeout=httpx.Timeout(request_timeout, connect=DEFAULT_CONNECT_TIMEOUT)
+        )
+        self._client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=self._http_client,
+            timeout=request_timeout,
+            # Retries happen here, where they can see the deadline and the breaker
+            max_retries=0
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrent_requests)
+
+    @property
+    def openai(self):
+        """The underlying AsyncOpenAI client"""
+        return self._client
+
+    async def complete(self, messages, model, max_tokens=300, temperature=0.8, timeout=None):
+        """Run one chat completion and return a CompletionResult.
+
+        Transient failures are retried until ``timeout`` runs out.
+        """
+        timeout = timeout or self.request_timeout
+        deadline = time.monotonic() + timeout
+        return await asyncio.wait_for(
+            self._with_retries(model, deadline, lambda: self._complete(messages, model, max_tokens, temperature, deadline)),
+            timeout
+        )
+
+    async def _complete(self, messages, model, max_tokens, temperature, deadline):
+        async with self._semaphore:
+            await self.pacer.wait(deadline)
+            self.in_flight += 1
+            start = time.perf_counter()
+            try:
+                raw = await self._client.chat.completions.with_raw_response.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature
+                )
+            finally:
+                self.in_flight -= 1
+
+        self.pacer.update(raw.headers)
+        response = raw.parse()
+        latency = time.perf_counter() - start
+        logger.info(f"Completion from {model} took {latency:.2f}s")
+        record_completion(model, latency, response.usage)
+        return CompletionResult(
+            text=response.choices[0].message.content,
+            model=response.model or model,
+            latency=latency,
+            usage=response.usage
+        )
+
+    async def _with_retries(self, model, deadline, attempt_once):
+        """Run ``attempt_once`` behind the circuit breaker, retrying transient failures"""
+        attempt = 0
+        while True:
+            self.breaker.allow()
+            try:
+                result = await attempt_once()
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except RateLimitPaused:
+                # Our own pacer: the API is up and waiting longer won't fit the deadline
+                self.breaker.release()
+                raise
+            except Exception as e:
+                record_error(e, f"openai:{model}")
+                reason = classify_error(e)
+                self.breaker.record_failure(reason)
+                headers = error_headers(e)
+                self.pacer.update(headers, getattr(e, "status_code", None))
+                delay = self.retry_policy.backoff(attempt, parse_retry_after(headers))
+                if not self.retry_policy.should_retry(attempt, reason, delay, deadline):
+                    raise
+                self.retries += 1
+                record_retry(model, reason)
+                logger.warning(f"{model} request failed ({reason}), retry {attempt + 1} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    async def _open_stream(self, messages, model, max_tokens, temperature, deadline):
+        await self.pacer.wait(deadline)
+        raw = await asyncio.wait_for(
+            self._client.chat.completions.with_raw_response.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True,
+                stream_options={"include_usage": True}
+            ),
+            max(deadline - time.monotonic(), 0)
+        )
+        self.pacer.update(raw.headers)
+        return raw.parse()
+
+    async def stream(self, messages, model, max_tokens=300, temperature=0.8, timeout=None, on_usage=None):
+        """Yield the reply text in pieces as the completion streams in.
+
+        ``timeout`` bounds the wait for a free slot and the first chunk
+        (retries included), and then the gap between consecutive chunks,
+        rather than the whole reply. Nothing is retried once text has
+        arrived. Token usage arrives in the last chunk and is passed to
+        ``on_usage``.
+        """
+        timeout = timeout or self.request_timeout
+        deadline = time.monotonic() + timeout
+        await asyncio.wait_for(self._semaphore.acquire(), timeout)
+        self.in_flight += 1
+        start = time.perf_counter()
+        usage = None
+        try:
+            stream = await self._with_retries(
+                model, deadline, lambda: self._open_stream(messages, model, max_tokens, temperature, deadline)
+            )
+            try:
+                chunks = stream.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout)
+                    except StopAsyncIteration:
+                        break
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+                    if getattr(chunk, "usage", None) is not None:
+                        usage = chunk.usage
+            except Exception as e:
+                record_error(e, f"openai:{model}")
+                raise
+            finally:
+                await stream.response.aclose()
+            record_completion(model, time.perf_counter() - start, usage)
+            if on_usage is not None and usage is not None:
+                on_usage(usage)
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self):
+        return dict(
+            self.breaker.stats(),
+            in_flight=self.in_flight,
+            retries=self.retries,
+            rate_limit_pauses=self.pacer.pauses,
+            paused_seconds=self.pacer.delay()
+        )
+
+    async def close(self):
+        """Close the shared HTTP connection pool"""
+        await self._client.close()
+
+
+def create_completion_client(api_key, settings=None):
+    """Build a CompletionClient from the bot_settings dict"""
+    settings = settings or {}
+    return CompletionClient(
+        api_key=api_key,
+        max_concurrent_requests=settings.get("max_concurrent_requests", DEFAULT_MAX_CONCURRENT_REQUESTS),
+        request_timeout=settings.get("request_timeout", DEFAULT_REQUEST_TIMEOUT),
+        max_connections=settings.get("max_connections", DEFAULT_MAX_CONNECTIONS),
+        retry_policy=RetryPolicy(
+            max_attempts=settings.get("retry_attempts", DEFAULT_MAX_ATTEMPTS),
+            base_delay=settings.get("retry_base_delay", DEFAULT_BASE_DELAY),
+            max_delay=settings.get("retry_max_delay", DEFAULT_MAX_DELAY)
+        ),
+        breaker=CircuitBreaker(
+            failure_threshold=settings.get("circuit_failure_threshold", DEFAULT_FAILURE_THRESHOLD),
+            recovery_time=settings.get("circuit_recovery_time", DEFAULT_RECOVERY_TIME)
+        )
+    )
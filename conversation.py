@@ -0,0 +1,171 @@
+import logging
+import time
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+
+DEFAULT_MAX_TURNS = 10
+DEFAULT_MAX_CHARS = 4000
+DEFAULT_MAX_TURN_CHARS = 1000
+DEFAULT_MAX_CHANNELS = 5000
+DEFAULT_IDLE_SECONDS = 3600
+DEFAULT_TOKEN_BUDGET = 1200
+SUMMARY_SNIPPET_CHARS = 60
+
+# =============================================================================
+# TOKEN ESTIMATES
+# =============================================================================
+
+def estimate_tokens(text):
+    """Cheap token estimate (about four characters per token for English)"""
+    return len(text) // 4 + 1
+
+# =============================================================================
+# CHANNEL HISTORY
+# =============================================================================
+
+class ChannelHistory:
+    """Ring buffer of the most recent turns in one channel"""
+
+    __slots__ = ("turns", "chars", "max_chars", "last_active")
+
+    def __init__(self, max_turns, max_chars):
+        self.turns = deque(maxlen=max_turns)
+        self.chars = 0
+        self.max_chars = max_chars
+        self.last_active = time.monotonic()
+
+    def append(self, role, content):
+        if len(self.turns) == self.turns.maxlen:
+            self.chars -= len(self.turns[0][1])
+        self.turns.append((role, content))
+        self.chars += len(content)
+
+        # Hard cap on memory per channel, regardless of turn count
+        while self.chars > self.max_chars and len(self.turns) > 1:
+            _, dropped = self.turns.popleft()
+            self.chars -= len(dropped)
+        self.last_active = time.monotonic()
+
+
+class ConversationMemory:
+    """Per-channel conversation history with bounded memory.
+
+    Each channel keeps at most ``max_turns`` turns and ``max_chars``
+    characters. Channels are kept in least-recently-active order; idle ones
+    are dropped after ``idle_seconds`` and the least active are dropped
+    once more than ``max_channels`` are tracked, so memory stays flat no
+    matter how many channels talk to Monday.
+    """
+
+    def __init__(self, max_turns=DEFAULT_MAX_TURNS, max_chars=DEFAULT_MAX_CHARS,
+                 max_turn_chars=DEFAULT_MAX_TURN_CHARS, max_channels=DEFAULT_MAX_CHANNELS,
+                 idle_seconds=DEFAULT_IDLE_SECONDS, token_budget=DEFAULT_TOKEN_BUDGET):
+        self.max_turns = max_turns
+        self.max_chars = max_chars
+        self.max_turn_chars = max_turn_chars
+        self.max_channels = max_channels
+        self.idle_seconds = idle_seconds
+        self.token_budget = token_budget
+        self.evictions = 0
+        self._channels = OrderedDict()
+
+    def add(self, channel_id, role, content):
+        """Record one turn (role is "user" or "assistant")"""
+        history = self._channels.get(channel_id)
+        if history is None:
+            history = self._channels[channel_id] = ChannelHistory(self.max_turns, self.max_chars)
+        else:
+            self._channels.move_to_end(channel_id)
+        history.append(role, content[:self.max_turn_chars])
+        self._evict()
+
+    def add_exchange(self, channel_id, user_content, reply):
+        self.add(channel_id, "user", user_content)
+        self.add(channel_id, "assistant", reply)
+
+    def _evict(self):
+        now = time.monotonic()
+        while self._channels:
+            channel_id, history = next(iter(self._channels.items()))
+            if len(self._channels) <= self.max_channels and now - history.last_active < self.idle_seconds:
+                break
+            del self._channels[channel_id]
+            self.evictions += 1
+
+    def has_history(self, channel_id):
+        """Whether the channel has turns recent enough to be sent as context"""
+        history = self._channels.get(channel_id)
+        return bool(history and history.turns and time.monotonic() - history.last_active < self.idle_seconds)
+
+    def forget(self, channel_id):
+        self._channels.pop(channel_id, None)
+
+    def build_messages(self, channel_id, system_prompt, user_content, token_budget=None,
+                       count_tokens=estimate_tokens):
+        """Chat messages for a request, fitting history into ``token_budget`` tokens.
+
+        The newest turns are kept whole; anything older that doesn't fit is
+        folded into a one-line summary of what the users asked, as long as
+        that still fits too. ``count_tokens`` can swap the estimate for a
+        real tokenizer.
+        """
+        budget = token_budget if token_budget is not None else self.token_budget
+        history = self._channels.get(channel_id)
+        turns = list(history.turns) if history else []
+        if history and time.monotonic() - history.last_active >= self.idle_seconds:
+            turns = []
+
+        kept = []
+        used = 0
+        for index in range(len(turns) - 1, -1, -1):
+            role, content = turns[index]
+            cost = count_tokens(content)
+            if used + cost > budget:
+                break
+            kept.append({"role": role, "content": content})
+            used += cost
+        else:
+            index = -1
+        kept.reverse()
+
+        messages = [{"role": "system", "content": system_prompt}]
+        summary = _summarize(turns[:index + 1])
+        if summary and used + count_tokens(summary) <= budget:
+            messages.append({"role": "system", "content": summary})
+        messages.extend(kept)
+        messages.append({"role": "user", "content": user_content})
+        return messages
+
+    def stats(self):
+        return {
+            "channels": len(self._channels),
+            "turns": sum(len(history.turns) for history in self._channels.values()),
+            "evictions": self.evictions
+        }
+
+
+def _summarize(turns):
+    """Compress dropped turns into a short reminder of what was asked"""
+    asked = [content[:SUMMARY_SNIPPET_CHARS] for role, content in turns if role == "user"]
+    if not asked:
+        return None
+    return "Earlier in this conversation: " + " | ".join(asked[-3:])
+
+
+def create_conversation_memory(settings=None):
+    """Build a ConversationMemory from the bot_settings dict, or None if disabled"""
+    settings = settings or {}
+    if not settings.get("conversation_memory", True):
+        return None
+    return ConversationMemory(
+        max_turns=settings.get("conversation_turns", DEFAULT_MAX_TURNS),
+        max_chars=settings.get("conversation_max_chars", DEFAULT_MAX_CHARS),
+        max_channels=settings.get("conversation_max_channels", DEFAULT_MAX_CHANNELS),
+        idle_seconds=settings.get("conversation_idle_seconds", DEFAULT_IDLE_SECONDS),
+        token_budget=settings.get("conversation_token_budget", DEFAULT_TOKEN_BUDGET)
+    )
@@ -0,0 +1,246 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+
+DEFAULT_STALL_THRESHOLD = 0.5
+DEFAULT_HEARTBEAT_INTERVAL = 0.1
+DEFAULT_SAMPLE_INTERVAL = 0.005
+DEFAULT_PROFILE_SECONDS = 30.0
+MAX_PROFILE_SECONDS = 300.0
+TOP_FUNCTIONS = 25
+
+# =============================================================================
+# STACKS
+# =============================================================================
+
+def thread_frame(thread_id):
+    """The frame a thread is executing right now, or None"""
+    return sys._current_frames().get(thread_id)
+
+
+def format_function(code):
+    return f"{os.path.basename(code.co_filename)} {getattr(code, 'co_qualname', code.co_name)}"
+
+
+def format_frame(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{frame.f_lineno} {getattr(code, 'co_qualname', code.co_name)}"
+
+
+def is_idle(frame):
+    """True if the event loop is waiting in its selector for something to happen"""
+    return frame is not None and os.path.basename(frame.f_code.co_filename) == "selectors.py"
+
+# =============================================================================
+# WATCHDOG
+# =============================================================================
+
+class LoopWatchdog:
+    """Notices when something blocks the event loop and records where.
+
+    A task on the loop stamps a heartbeat every ``interval`` seconds, and
+    a thread checks it. Once the heartbeat is ``threshold`` seconds late,
+    the thread grabs the loop thread's stack - the code that is blocking
+    it, such as a synchronous HTTP call - and logs it straight away, in
+    case the loop never comes back. When it does, the stall's length is
+    logged too.
+    """
+
+    def __init__(self, threshold=DEFAULT_STALL_THRESHOLD, interval=DEFAULT_HEARTBEAT_INTERVAL):
+        self.threshold = threshold
+        self.interval = interval
+        self.stalls = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.longest_stall = 0.0
+        self.longest_stall_stack = None
+        self._beat = time.monotonic()
+        self._stall_stack = None
+        self._loop_thread = None
+        self._task = None
+        self._thread = None
+
+    def start(self):
+        """Start watching the running loop (safe to call on every on_ready)"""
+        if self._task is not None and not self._task.done():
+            return
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._task = asyncio.create_task(self._heartbeat())
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._thread.start()
+        logger.info(f"Event loop watchdog started (threshold {self.threshold}s)")
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.last_lag = max(0.0, now - expected)
+            self.max_lag = max(self.max_lag, self.last_lag)
+            self._beat = now
+
+    def _watch(self):
+        stalled_since = None
+        while True:
+            time.sleep(self.interval)
+            beat = self._beat
+            behind = time.monotonic() - beat - self.interval
+            if behind >= self.threshold and stalled_since != beat:
+                stalled_since = beat
+                frame = thread_frame(self._loop_thread)
+                self._stall_stack = "".join(traceback.format_stack(frame)) if frame else "(no stack)"
+                self.stalls += 1
+                logger.warning(f"Event loop blocked for over {behind:.2f}s in:\n{self._stall_stack}")
+            elif stalled_since is not None and stalled_since != beat:
+                # The loop is back; the lag it noticed on waking is the stall's full length
+                stalled_since = None
+                if self.last_lag > self.longest_stall:
+                    self.longest_stall = self.last_lag
+                    self.longest_stall_stack = self._stall_stack
+                logger.warning(f"Event loop unblocked after {self.last_lag:.2f}s")
+
+    def stats(self):
+        return {
+            "stalls": self.stalls,
+            "lag_seconds": self.last_lag,
+            "max_lag_seconds": self.max_lag,
+            "longest_stall_seconds": self.longest_stall
+        }
+
+
+def create_watchdog(settings=None):
+    """Build a LoopWatchdog from the bot_settings dict, or None if disabled"""
+    settings = settings or {}
+    threshold = settings.get("watchdog_threshold", DEFAULT_STALL_THRESHOLD)
+    if not threshold:
+        return None
+    return LoopWatchdog(threshold=threshold)
+
+# =============================================================================
+# SAMPLING PROFILER
+# =============================================================================
+
+class SamplingProfiler:
+    """Samples the event loop thread's stack from another thread.
+
+    Every ``interval`` seconds it records the innermost line ("self"
+    time), every function on the stack ("total" time) and which asyncio
+    task was running, so each is charged roughly ``interval`` seconds of
+    time on the loop per sample. Samples inside a command's callback
+    (``command_codes`` maps callback code objects to command names) are
+    charged to the command as well. Samples where the loop sits in its
+    selector count as idle. Command wall times come from the bot via
+    ``record_command``.
+    """
+
+    def __init__(self, loop, loop_thread, interval=DEFAULT_SAMPLE_INTERVAL, command_codes=None):
+        self.loop = loop
+        self.loop_thread = loop_thread
+        self.interval = interval
+        self.command_codes = command_codes or {}
+        self.samples = 0
+        self.idle = 0
+        self.self_time = Counter()
+        self.total_time = Counter()
+        self.tasks = Counter()
+        self.command_time = Counter()
+        self.commands = {}
+        self.wall = 0.0
+        self.cpu = 0.0
+        self._stop = threading.Event()
+
+    def sample(self):
+        frame = thread_frame(self.loop_thread)
+        if frame is None:
+            return
+        self.samples += 1
+        if is_idle(frame):
+            self.idle += 1
+            return
+        self.self_time[format_frame(frame)] += 1
+        seen = set()
+        command = None
+        while frame is not None:
+            name = format_function(frame.f_code)
+            if name not in seen:
+                seen.add(name)
+                self.total_time[name] += 1
+            command = command or self.command_codes.get(frame.f_code)
+            frame = frame.f_back
+        if command is not None:
+            self.command_time[command] += 1
+        task = asyncio.current_task(self.loop)
+        if task is not None:
+            coro = task.get_coro()
+            self.tasks[getattr(coro, "__qualname__", task.get_name())] += 1
+
+    def run(self, duration):
+        """Sample for ``duration`` seconds (blocking; run it in a thread)"""
+        started, cpu_started = time.perf_counter(), time.process_time()
+        deadline = started + duration
+        while not self._stop.is_set() and time.perf_counter() < deadline:
+            self.sample()
+            self._stop.wait(self.interval)
+        self.wall = time.perf_counter() - started
+        self.cpu = time.process_time() - cpu_started
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def record_command(self, name, seconds):
+        self.commands.setdefault(name, []).append(seconds)
+
+    def summary(self, watchdog=None):
+        """A plain-text report of where the loop's time went"""
+        busy = self.samples - self.idle
+        per_sample = self.wall / self.samples if self.samples else self.interval
+
+        def share(count):
+            return f"{count * per_sample:7.2f}s {count / self.samples:6.1%}" if self.samples else "-"
+
+        lines = [
+            f"Profile: {self.wall:.1f}s wall, {self.cpu:.2f}s CPU ({self.cpu / max(self.wall, 1e-9):.0%} of one core), "
+            f"{self.samples} samples",
+            f"Event loop busy {share(busy)}, idle {share(self.idle)}",
+        ]
+        if watchdog is not None:
+            lines.append(f"Watchdog: {watchdog.stalls} stall(s), longest {watchdog.longest_stall:.2f}s, "
+                         f"max lag {watchdog.max_lag:.3f}s")
+
+        lines += ["", "Commands (count, mean wall, max wall, time on the event loop):"]
+        for name in sorted(set(self.commands) | set(self.command_time)):
+            times = self.commands.get(name, [0.0])
+            lines.append(f"  {name:20} {len(self.commands.get(name, ())):5} {sum(times) / len(times):8.3f}s "
+                         f"{max(times):8.3f}s  {share(self.command_time[name])}")
+        if not self.commands and not self.command_time:
+            lines.append("  (none)")
+
+        lines += ["", "Tasks (time on the event loop):"]
+        for name, count in self.tasks.most_common(TOP_FUNCTIONS):
+            lines.append(f"  {share(count)}  {name}")
+
+        lines += ["", "Lines by self time:"]
+        for name, count in self.self_time.most_common(TOP_FUNCTIONS):
+            lines.append(f"  {share(count)}  {name}")
+
+        lines += ["", "Functions by total time:"]
+        for name, count in self.total_time.most_common(TOP_FUNCTIONS):
+            lines.append(f"  {share(count)}  {name}")
+
+        if watchdog is not None and watchdog.longest_stall_stack:
+            lines += ["", f"Longest stall ({watchdog.longest_stall:.2f}s) was in:", watchdog.longest_stall_stack]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,136 @@
+import time
+from collections import OrderedDict
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+
+# Name -> seconds; rates are reported per minute over each window
+DEFAULT_WINDOWS = {"5m": 300, "1h": 3600}
+DEFAULT_BUCKETS = 60
+DEFAULT_MAX_GUILDS = 10000
+
+# =============================================================================
+# RING COUNTERS
+# =============================================================================
+
+class RingCounter:
+    """Events in the last ``window`` seconds, kept in ``buckets`` time slices.
+
+    Slices are reused in a ring and a running total is kept, so adding an
+    event or reading the count only clears the slices that have expired
+    since the last call (never more than ``buckets``), whatever the rate.
+    The window slides one slice at a time: the count covers the current,
+    partial slice and the ``buckets - 1`` before it.
+    """
+
+    __slots__ = ("width", "counts", "head", "total")
+
+    def __init__(self, window, buckets=DEFAULT_BUCKETS):
+        self.width = window / buckets
+        self.counts = [0] * buckets
+        self.head = None
+        self.total = 0
+
+    def _advance(self, now):
+        index = int(now // self.width)
+        if self.head is None or index - self.head >= len(self.counts):
+            # Nothing recent left (or nothing yet): start the ring over
+            self.counts = [0] * len(self.counts)
+            self.total = 0
+        elif index > self.head:
+            for expired in range(self.head + 1, index + 1):
+                slot = expired % len(self.counts)
+                self.total -= self.counts[slot]
+                self.counts[slot] = 0
+        else:
+            return index
+        self.head = index
+        return index
+
+    def add(self, now, amount=1):
+        index = self._advance(now)
+        self.counts[index % len(self.counts)] += amount
+        self.total += amount
+
+    def count(self, now):
+        self._advance(now)
+        return self.total
+
+# =============================================================================
+# LOAD TRACKER
+# =============================================================================
+
+class LoadTracker:
+    """Sliding-window request rates, overall and per guild.
+
+    Every request is added to one RingCounter per window, for the whole
+    bot and for its guild, and rates are read straight from the running
+    totals, so the current load is always up to date without any
+    periodic recompute. The mood, ``!status`` and anything deciding
+    whether to take on more work can all read the same numbers. Guilds
+    that stop sending requests are dropped least recently used first
+    once more than ``max_guilds`` are tracked.
+    """
+
+    def __init__(self, windows=None, buckets=DEFAULT_BUCKETS, max_guilds=DEFAULT_MAX_GUILDS):
+        self.windows = dict(windows or DEFAULT_WINDOWS)
+        self.buckets = buckets
+        self.max_guilds = max_guilds
+        self._global = self._counters()
+        self._guilds = OrderedDict()
+
+    def _counters(self):
+        return {name: RingCounter(seconds, self.buckets) for name, seconds in self.windows.items()}
+
+    def _scope(self, guild_id, create=False):
+        if guild_id is None:
+            return self._global
+        counters = self._guilds.get(guild_id)
+        if counters is not None:
+            self._guilds.move_to_end(guild_id)
+        elif create:
+            counters = self._guilds[guild_id] = self._counters()
+            if len(self._guilds) > self.max_guilds:
+                self._guilds.popitem(last=False)
+        return counters
+
+    def record(self, guild_id=None, now=None):
+        """Count one request, for the whole bot and for its guild"""
+        now = time.monotonic() if now is None else now
+        for counter in self._global.values():
+            counter.add(now)
+        if guild_id is not None:
+            for counter in self._scope(guild_id, create=True).values():
+                counter.add(now)
+
+    def count(self, window, guild_id=None, now=None):
+        """Requests in ``window`` (a name from ``windows``), for one guild or overall"""
+        counters = self._scope(guild_id)
+        if counters is None:
+            return 0
+        return counters[window].count(time.monotonic() if now is None else now)
+
+    def rate(self, window, guild_id=None, now=None):
+        """Requests per minute over ``window``"""
+        return self.count(window, guild_id, now) * 60 / self.windows[window]
+
+    def status_line(self, guild_id=None):
+        rates = ", ".join(f"{self.rate(window, guild_id):.1f}/min over {window}" for window in self.windows)
+        return f"Load{' here' if guild_id is not None else ''}: {rates}"
+
+    def stats(self):
+        return {
+            "requests_per_minute": {window: self.rate(window) for window in self.windows},
+            "guilds_tracked": len(self._guilds)
+        }
+
+
+def create_load_tracker(settings=None):
+    """Build a LoadTracker from the bot_settings dict"""
+    settings = settings or {}
+    return LoadTracker(
+        windows=settings.get("load_windows", DEFAULT_WINDOWS),
+        buckets=settings.get("load_buckets", DEFAULT_BUCKETS),
+        max_guilds=settings.get("load_max_guilds", DEFAULT_MAX_GUILDS)
+    )
@@ -0,0 +1,289 @@
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+
+DEFAULT_LEVEL = "INFO"
+DEFAULT_FORMAT = "json"
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_FLUSH_INTERVAL = 0.5
+DEFAULT_ERROR_WINDOW = 60.0
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Settings read from the environment before config.json has been loaded
+ENV_SETTINGS = {"log_level": "LOG_LEVEL", "log_format": "LOG_FORMAT", "log_path": "LOG_PATH"}
+
+# Credentials that must never reach the logs, whatever message they turn up in
+SECRET_PATTERNS = (
+    re.compile(r"sk-[A-Za-z0-9_-]{20,}"),
+    re.compile(r"[\w-]{24,28}\.[\w-]{6,7}\.[\w-]{27,}"),
+)
+
+# Attributes every LogRecord has; anything else was passed in ``extra``
+RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_STOP = object()
+
+# =============================================================================
+# FORMATTING
+# =============================================================================
+
+def redact(text):
+    for pattern in SECRET_PATTERNS:
+        text = pattern.sub("[redacted]", text)
+    return text
+
+
+class LogFormatter(logging.Formatter):
+    """One JSON object (or one classic text line) per record, with secrets redacted.
+
+    Fields passed with ``extra=`` become JSON keys. ``content`` is for
+    what users typed: it is logged as its length unless ``log_content``
+    is on.
+    """
+
+    def __init__(self, json_output=True, log_content=False):
+        super().__init__(TEXT_FORMAT)
+        self.json_output = json_output
+        self.log_content = log_content
+
+    def format(self, record):
+        fields = {key: value for key, value in vars(record).items() if key not in RECORD_ATTRIBUTES}
+        if "content" in fields and not self.log_content:
+            fields["content"] = f"<{len(str(fields['content']))} chars>"
+
+        if not self.json_output:
+            line = super().format(record)
+            if fields:
+                line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+            return redact(line)
+
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(fields)
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return redact(json.dumps(entry, default=str))
+
+# =============================================================================
+# PIPELINE
+# =============================================================================
+
+class PipelineHandler(logging.Handler):
+    """Takes logging off the event loop: records are queued and written in batches.
+
+    ``emit`` runs on the logging thread and only samples and enqueues, so
+    a log call costs about as much as a dict lookup; formatting (including
+    tracebacks) and I/O happen on a background thread that writes up to
+    ``batch_size`` lines at a time, at least every ``flush_interval``
+    seconds. If the queue fills up, records are dropped and counted
+    rather than blocking the bot.
+
+    Records below WARNING from loggers in ``sample_rates`` are kept with
+    that probability. Warnings and errors are never sampled, but repeats
+    from the same line of code within ``error_window`` seconds are
+    collapsed into one record and a count of how many were suppressed.
+    """
+
+    def __init__(self, stream=None, queue_size=DEFAULT_QUEUE_SIZE, batch_size=DEFAULT_BATCH_SIZE,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, error_window=DEFAULT_ERROR_WINDOW,
+                 sample_rates=None, formatter=None):
+        super().__init__()
+        self.stream = stream or sys.stderr
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.error_window = error_window
+        self.sample_rates = dict(sample_rates or {})
+        self.setFormatter(formatter or LogFormatter())
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.written = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.suppressed = 0
+        self._rates = {}
+        # (logger, file, line) -> [window start, suppressed count, first record]
+        self._windows = {}
+        self._last_sweep = 0.0
+        self._owns_stream = False
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def configure(self, settings):
+        """Apply the bot_settings dict once it has been loaded"""
+        settings = settings or {}
+        logging.getLogger().setLevel(settings.get("log_level", DEFAULT_LEVEL).upper())
+        self.setFormatter(LogFormatter(
+            json_output=settings.get("log_format", DEFAULT_FORMAT) == "json",
+            log_content=settings.get("log_content", False)
+        ))
+        self.sample_rates = dict(settings.get("log_sample_rates", {}))
+        self._rates = {}
+        self.error_window = settings.get("log_error_window", DEFAULT_ERROR_WINDOW)
+        if settings.get("log_path") and getattr(self.stream, "name", None) != settings["log_path"]:
+            stream = open(settings["log_path"], "a", encoding="utf-8")
+            old_stream, owned = self.stream, self._owns_stream
+            self.stream, self._owns_stream = stream, True
+            if owned:
+                old_stream.close()
+
+    # -------------------------------------------------------------------------
+    # Caller side
+    # -------------------------------------------------------------------------
+
+    def _sample_rate(self, name):
+        rate = self._rates.get(name)
+        if rate is None:
+            # The most specific configured logger wins: "monday.cogs.chat" over "monday"
+            rate = 1.0
+            for prefix in sorted(self.sample_rates, key=len, reverse=True):
+                if name == prefix or name.startswith(prefix + "."):
+                    rate = self.sample_rates[prefix]
+                    break
+            self._rates[name] = rate
+        return rate
+
+    def emit(self, record):
+        if record.levelno < logging.WARNING and self.sample_rates:
+            rate = self._sample_rate(record.name)
+            if rate < 1.0 and random.random() >= rate:
+                self.sampled_out += 1
+                return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    # -------------------------------------------------------------------------
+    # Writer thread
+    # -------------------------------------------------------------------------
+
+    def _collapse(self, record):
+        """False if ``record`` repeats a warning or error already written in this window"""
+        if record.levelno < logging.WARNING or self.error_window <= 0:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        window = self._windows.get(key)
+        if window is None or record.created - window[0] >= self.error_window:
+            if window is not None and window[1]:
+                record.suppressed = window[1]
+            # Keep a copy for the summary, without the traceback and the frames it holds
+            first = logging.makeLogRecord(vars(record))
+            first.exc_info = first.exc_text = None
+            self._windows[key] = [record.created, 0, first]
+            return True
+        window[1] += 1
+        self.suppressed += 1
+        return False
+
+    def _sweep(self, now, flush_all=False):
+        """Report and forget windows that have ended with repeats still unreported"""
+        summaries = []
+        for key, (started, count, record) in list(self._windows.items()):
+            if now - started < self.error_window and not flush_all:
+                continue
+            del self._windows[key]
+            if count:
+                summary = logging.makeLogRecord(vars(record))
+                summary.created = now
+                summary.suppressed = count
+                summaries.append(summary)
+        return summaries
+
+    def _write(self, records):
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                self.handleError(record)
+        if not lines:
+            return
+        try:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+            self.written += len(lines)
+        except Exception:
+            self.handleError(records[-1])
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            try:
+                batch.append(self.queue.get(timeout=self.flush_interval))
+                while len(batch) < self.batch_size:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+            if batch and batch[-1] is _STOP:
+                batch.pop()
+                stopping = True
+
+            records = [record for record in batch if self._collapse(record)]
+            now = time.time()
+            if now - self._last_sweep >= 1.0 or stopping:
+                self._last_sweep = now
+                records.extend(self._sweep(now, flush_all=stopping))
+            self._write(records)
+
+    def stats(self):
+        return {
+            "queued": self.queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "sampled_out": self.sampled_out,
+            "suppressed": self.suppressed
+        }
+
+    def close(self):
+        """Write out everything queued, then stop the writer thread"""
+        if self._thread.is_alive():
+            self.queue.put(_STOP)
+            self._thread.join(timeout=5)
+        if self._owns_stream:
+            self.stream.close()
+            self._owns_stream = False
+        super().close()
+
+
+def setup_logging(settings=None):
+    """Route all logging through a PipelineHandler and return it.
+
+    Call it first thing; the level, format and output can come from the
+    LOG_LEVEL, LOG_FORMAT and LOG_PATH environment variables before the
+    config is loaded, then ``handler.configure(settings)`` applies the
+    rest of bot_settings.
+    """
+    settings = dict(settings or {})
+    for key, env_var in ENV_SETTINGS.items():
+        if os.environ.get(env_var):
+            settings.setdefault(key, os.environ[env_var])
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    handler = PipelineHandler(
+        queue_size=settings.get("log_queue_size", DEFAULT_QUEUE_SIZE),
+        batch_size=settings.get("log_batch_size", DEFAULT_BATCH_SIZE),
+        flush_interval=settings.get("log_flush_interval", DEFAULT_FLUSH_INTERVAL)
+    )
+    handler.configure(settings)
+    root.addHandler(handler)
+    return handler
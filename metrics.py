@@ -0,0 +1,297 @@
+import asyncio
+import logging
+import math
+import time
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+
+DEFAULT_METRICS_HOST = "127.0.0.1"
+DEFAULT_LAG_INTERVAL = 0.5
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+# =============================================================================
+# METRIC TYPES
+# =============================================================================
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self):
+        for key, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def total(self, **labels):
+        """Sum over every label combination, or only those matching ``labels``"""
+        if not labels:
+            return sum(self._values.values())
+        positions = [(self.labelnames.index(name), str(value)) for name, value in labels.items()]
+        return sum(
+            value for key, value in self._values.items()
+            if all(key[index] == wanted for index, wanted in positions)
+        )
+
+
+class Gauge(Metric):
+    """A value that is either set directly or read from ``callback`` on scrape"""
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def set(self, value, **labels):
+        self._values[self._key(labels)] = value
+
+    def _samples(self):
+        if self.callback is not None:
+            try:
+                value = self.callback()
+            except Exception as e:
+                logger.warning(f"Metric {self.name} callback failed: {e}")
+                return
+            if isinstance(value, dict):
+                for key, item in value.items():
+                    key = key if isinstance(key, tuple) else (key,)
+                    yield f"{self.name}{_format_labels(self.labelnames, key)} {item}"
+            else:
+                yield f"{self.name} {value}"
+            return
+        yield from super()._samples()
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            # Per-bucket counts (the last one is +Inf), then sum
+            state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        counts = state[0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+                break
+        else:
+            counts[-1] += 1
+        state[1] += value
+
+    def _samples(self):
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', le))} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {total}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            return self._metrics[metric.name]
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), callback=None):
+        gauge = self.register(Gauge(name, documentation, labelnames))
+        if callback is not None:
+            gauge.callback = callback
+        return gauge
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# =============================================================================
+# BOT METRICS
+# =============================================================================
+
+registry = MetricsRegistry()
+
+COMMANDS = registry.counter("monday_commands_total", "Commands invoked", ("command", "outcome"))
+COMMAND_LATENCY = registry.histogram("monday_command_seconds", "Command wall time", ("command",))
+OPENAI_LATENCY = registry.histogram("monday_openai_seconds", "OpenAI request latency", ("model",))
+OPENAI_TOKENS = registry.counter("monday_openai_tokens_total", "OpenAI tokens used", ("model", "kind"))
+ERRORS = registry.counter("monday_errors_total", "Errors by exception type", ("where", "type"))
+RETRIES = registry.counter("monday_openai_retries_total", "OpenAI requests retried", ("model", "reason"))
+EVENT_LOOP_LAG = registry.histogram("monday_event_loop_lag_seconds", "Event loop scheduling delay", buckets=LAG_BUCKETS)
+STARTUP = registry.gauge("monday_startup_seconds", "Seconds spent in each startup phase", ("phase",))
+
+
+def record_error(error, where):
+    """Count an exception by where it happened and its type"""
+    ERRORS.inc(where=where, type=type(error).__name__)
+
+
+def record_retry(model, reason):
+    RETRIES.inc(model=model, reason=reason)
+
+
+def record_completion(model, latency, usage=None):
+    OPENAI_LATENCY.observe(latency, model=model)
+    if usage is not None:
+        OPENAI_TOKENS.inc(getattr(usage, "prompt_tokens", 0) or 0, model=model, kind="prompt")
+        OPENAI_TOKENS.inc(getattr(usage, "completion_tokens", 0) or 0, model=model, kind="completion")
+        # Prompt tokens served from the provider's prefix cache
+        details = getattr(usage, "prompt_tokens_details", None)
+        OPENAI_TOKENS.inc(getattr(details, "cached_tokens", 0) or 0, model=model, kind="cached")
+
+
+def instrument_bot(bot, **components):
+    """Count and time every command, and export gateway and component gauges.
+
+    ``components`` are objects with a ``stats()`` dict of numbers (the
+    scheduler, rate limiter, response cache...), exported as
+    ``monday_<name>_<stat>`` gauges.
+    """
+    async def on_command(ctx):
+        ctx.metrics_started = time.perf_counter()
+
+    async def on_command_completion(ctx):
+        _finish_command(ctx, "ok")
+
+    async def on_command_error(ctx, error):
+        if ctx.command is None:
+            return
+        _finish_command(ctx, "error")
+        record_error(getattr(error, "original", error), f"command:{ctx.command.name}")
+
+    bot.add_listener(on_command)
+    bot.add_listener(on_command_completion)
+    bot.add_listener(on_command_error)
+
+    registry.gauge("monday_gateway_latency_seconds", "Discord gateway heartbeat latency",
+                   callback=lambda: 0 if math.isnan(bot.latency) else bot.latency)
+    registry.gauge("monday_guilds", "Guilds the bot is in", callback=lambda: len(bot.guilds))
+    for name, component in components.items():
+        if component is not None:
+            export_stats(name, component)
+
+
+def _finish_command(ctx, outcome):
+    name = ctx.command.name
+    COMMANDS.inc(command=name, outcome=outcome)
+    started = getattr(ctx, "metrics_started", None)
+    if started is not None:
+        COMMAND_LATENCY.observe(time.perf_counter() - started, command=name)
+
+
+def export_stats(name, component):
+    """Export a component's numeric ``stats()`` as ``monday_<name>_<stat>`` gauges"""
+    for stat, value in component.stats().items():
+        if isinstance(value, (int, float)):
+            registry.gauge(
+                f"monday_{name}_{stat}", f"{name} {stat.replace('_', ' ')}",
+                callback=lambda stat=stat: component.stats()[stat]
+            )
+        elif isinstance(value, dict):
+            registry.gauge(
+                f"monday_{name}_{stat}", f"{name} {stat.replace('_', ' ')}", ("key",),
+                callback=lambda stat=stat: component.stats()[stat]
+            )
+
+# =============================================================================
+# EVENT LOOP LAG
+# =============================================================================
+
+async def monitor_event_loop_lag(interval=DEFAULT_LAG_INTERVAL):
+    """Sleep ``interval`` over and over and record how late each wakeup is"""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(0.0, loop.time() - expected))
+
+# =============================================================================
+# HTTP ENDPOINT
+# =============================================================================
+
+_runner = None
+_lag_task = None
+
+
+async def start_metrics_server(port, host=DEFAULT_METRICS_HOST, lag_interval=DEFAULT_LAG_INTERVAL):
+    """Serve /metrics from this process and start the event loop lag monitor.
+
+    Safe to call more than once (on_ready fires again after reconnects).
+    """
+    global _runner, _lag_task
+    if _runner is not None:
+        return
+
+    async def handle_metrics(request):
+        return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    _runner = web.AppRunner(app, access_log=None)
+    await _runner.setup()
+    await web.TCPSite(_runner, host, port).start()
+    _lag_task = asyncio.create_task(monitor_event_loop_lag(lag_interval))
+    logger.info(f"Metrics available at http://{host}:{port}/metrics")
@@ -0,0 +1,272 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+from resilience import CircuitOpen, RateLimitPaused
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+
+DEFAULT_LATENCY_BUDGET = 10.0
+DEFAULT_ERROR_RATE_THRESHOLD = 0.5
+DEFAULT_STATS_WINDOW = 100
+DEFAULT_STATS_MAX_AGE = 300.0
+MIN_SAMPLES = 5
+
+# =============================================================================
+# PER-MODEL STATS
+# =============================================================================
+
+class ModelStats:
+    """Rolling latency and outcome window for a single model.
+
+    Latencies come from successes only: the full reply for a completion,
+    the first chunk for a stream. Attempts cancelled because the other
+    model answered first are counted as abandoned, not as successes.
+
+    Anything older than ``max_age`` seconds is forgotten, so a model that
+    was demoted (and gets little traffic since) drops below MIN_SAMPLES
+    and is tried first again once its bad spell has aged out.
+    """
+
+    OK = "ok"
+    ERROR = "error"
+    ABANDONED = "abandoned"
+
+    def __init__(self, window=DEFAULT_STATS_WINDOW, max_age=DEFAULT_STATS_MAX_AGE):
+        self.max_age = max_age
+        # (time.monotonic(), value) pairs, oldest first
+        self._latencies = deque(maxlen=window)
+        self._outcomes = deque(maxlen=window)
+
+    def record_success(self, latency):
+        now = time.monotonic()
+        self._latencies.append((now, latency))
+        self._outcomes.append((now, self.OK))
+
+    def record_error(self):
+        self._outcomes.append((time.monotonic(), self.ERROR))
+
+    def record_abandoned(self):
+        self._outcomes.append((time.monotonic(), self.ABANDONED))
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.max_age
+        for entries in (self._latencies, self._outcomes):
+            while entries and entries[0][0] < cutoff:
+                entries.popleft()
+
+    @property
+    def latencies(self):
+        self._expire()
+        return [latency for _, latency in self._latencies]
+
+    @property
+    def outcomes(self):
+        self._expire()
+        return [outcome for _, outcome in self._outcomes]
+
+    @property
+    def samples(self):
+        return len(self.outcomes)
+
+    def _rate(self, outcome):
+        outcomes = self.outcomes
+        if not outcomes:
+            return 0.0
+        return outcomes.count(outcome) / len(outcomes)
+
+    @property
+    def error_rate(self):
+        return self._rate(self.ERROR)
+
+    @property
+    def abandon_rate(self):
+        return self._rate(self.ABANDONED)
+
+    def percentile(self, pct):
+        """Latency at the given percentile, or None without data"""
+        ordered = sorted(self.latencies)
+        if not ordered:
+            return None
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    @property
+    def p50(self):
+        return self.percentile(50)
+
+    @property
+    def p95(self):
+        return self.percentile(95)
+
+    def snapshot(self):
+        return {
+            "samples": self.samples,
+            "p50": self.p50,
+            "p95": self.p95,
+            "error_rate": self.error_rate,
+            "abandon_rate": self.abandon_rate
+        }
+
+# =============================================================================
+# ROUTER
+# =============================================================================
+
+class ModelRouter:
+    """Send completions to the primary model, hedging to the fallback when it lags.
+
+    Each command has a latency budget. If the primary model has not answered
+    within that budget (or within its own recent p95, whichever is sooner),
+    the same request is fired at the fallback model and the first good answer
+    wins. A primary that is erroring or losing the race more than
+    ``error_rate_threshold`` of the time, or whose p95 is already over
+    budget, is skipped and the fallback goes first instead.
+    """
+
+    def __init__(self, client, primary, fallback=None, latency_budgets=None,
+                 default_budget=DEFAULT_LATENCY_BUDGET,
+                 error_rate_threshold=DEFAULT_ERROR_RATE_THRESHOLD,
+                 window=DEFAULT_STATS_WINDOW, max_age=DEFAULT_STATS_MAX_AGE):
+        self.client = client
+        self.primary = primary
+        self.fallback = fallback if fallback != primary else None
+        self.latency_budgets = latency_budgets or {}
+        self.default_budget = default_budget
+        self.error_rate_threshold = error_rate_threshold
+        self.window = window
+        self.max_age = max_age
+        self.stats = {}
+
+    def stats_for(self, model):
+        if model not in self.stats:
+            self.stats[model] = ModelStats(self.window, self.max_age)
+        return self.stats[model]
+
+    def budget_for(self, command):
+        return self.latency_budgets.get(command, self.default_budget)
+
+    def is_degraded(self, model, budget):
+        """Whether recent history says this model is erroring or too slow"""
+        stats = self.stats_for(model)
+        if stats.samples < MIN_SAMPLES:
+            return False
+        # Losing to the other model means it was slower than the budget allowed
+        if stats.error_rate + stats.abandon_rate >= self.error_rate_threshold:
+            return True
+        p95 = stats.p95
+        return p95 is not None and p95 > budget
+
+    def plan(self, command):
+        """Pick (first, second, hedge_after) for a request to this command"""
+        budget = self.budget_for(command)
+        first, second = self.primary, self.fallback
+        if second and self.is_degraded(first, budget) and not self.is_degraded(second, budget):
+            first, second = second, first
+
+        hedge_after = budget
+        p95 = self.stats_for(first).p95
+        if p95 is not None and self.stats_for(first).samples >= MIN_SAMPLES:
+            hedge_after = min(budget, p95)
+        return first, second, hedge_after
+
+    async def complete(self, messages, command="monday", **kwargs):
+        """Run a completion for ``command`` and return the first good CompletionResult"""
+        first, second, hedge_after = self.plan(command)
+        if not second:
+            return await self._attempt(first, messages, kwargs)
+
+        tasks = [asyncio.create_task(self._attempt(first, messages, kwargs))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if done and tasks[0].exception() is None:
+                return tasks[0].result()
+
+            if done:
+                logger.warning(f"{first} failed, failing over to {second}")
+            else:
+                logger.warning(f"{first} exceeded {hedge_after:.1f}s for !{command}, hedging with {second}")
+            tasks.append(asyncio.create_task(self._attempt(second, messages, kwargs)))
+
+            pending = {task for task in tasks if not task.done()}
+            last_error = tasks[0].exception() if tasks[0].done() else None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+            raise last_error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def stream(self, messages, command="monday", **kwargs):
+        """Stream a completion for ``command``, failing over if nothing has arrived yet.
+
+        A half-streamed reply can't be hedged, so the fallback model is only
+        tried when the first model fails before producing any text. The
+        latency recorded is the time to the first chunk, since how long the
+        rest takes depends on the reply's length rather than the model.
+        """
+        first, second, _ = self.plan(command)
+        models = [first, second] if second else [first]
+        for model in models:
+            stats = self.stats_for(model)
+            start = time.perf_counter()
+            first_chunk = None
+            try:
+                async for chunk in self.client.stream(messages, model=model, **kwargs):
+                    if first_chunk is None:
+                        first_chunk = time.perf_counter() - start
+                    yield chunk
+            except (CircuitOpen, RateLimitPaused):
+                # The whole API is down or paused; no model is to blame and none can help
+                raise
+            except Exception:
+                stats.record_error()
+                if first_chunk is not None or model == models[-1]:
+                    raise
+                logger.warning(f"{model} failed before streaming, failing over to {models[-1]}")
+                continue
+            stats.record_success(first_chunk if first_chunk is not None else time.perf_counter() - start)
+            return
+
+    async def _attempt(self, model, messages, kwargs):
+        stats = self.stats_for(model)
+        start = time.perf_counter()
+        try:
+            result = await self.client.complete(messages, model=model, **kwargs)
+        except asyncio.CancelledError:
+            stats.record_abandoned()
+            raise
+        except (CircuitOpen, RateLimitPaused):
+            raise
+        except Exception:
+            stats.record_error()
+            raise
+        stats.record_success(time.perf_counter() - start)
+        return result
+
+    def snapshot(self):
+        """Current stats for every model seen so far"""
+        return {model: stats.snapshot() for model, stats in self.stats.items()}
+
+
+def create_model_router(client, settings=None, default_model="gpt-4"):
+    """Build a ModelRouter from the bot_settings dict"""
+    settings = settings or {}
+    return ModelRouter(
+        client,
+        primary=settings.get("default_model", default_model),
+        fallback=settings.get("fallback_model"),
+        latency_budgets=settings.get("latency_budgets"),
+        default_budget=settings.get("default_latency_budget", DEFAULT_LATENCY_BUDGET),
+        error_rate_threshold=settings.get("error_rate_threshold", DEFAULT_ERROR_RATE_THRESHOLD),
+        max_age=settings.get("model_stats_max_age", DEFAULT_STATS_MAX_AGE)
+    )
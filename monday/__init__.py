@@ -0,0 +1,9 @@
+"""Monday, the sarcastic Discord bot.
+
+``monday.app`` builds the bot for a profile (``bot`` or ``enhanced``) and
+loads the command cogs named in ``bot_settings["cogs"]`` from
+``monday.cogs``. ``monday_bot.py`` and ``monday_enhanced.py`` are thin
+entry points into it.
+"""
+# Imported first so startup timing includes loading discord.py and friends
+from monday.startup import startup_timer
@@ -0,0 +1,143 @@
+import logging
+
+import discord
+from discord.ext import commands
+
+from log_pipeline import setup_logging
+from metrics import export_stats, instrument_bot, start_metrics_server
+from monday.config import load_config
+from monday.services import Services
+from monday.startup import startup_timer
+from rate_limiter import RateLimited
+from sharding import create_bot, start_worker_reporting
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# BOT SETUP
+# =============================================================================
+
+def create_app(profile='bot', config=None):
+    """Build the bot for a profile; its cogs are loaded in setup_hook.
+
+    Nothing here talks to OpenAI or opens a database: ``bot.services``
+    builds those on first use, so a restart gets back on the gateway as
+    quickly as discord.py allows.
+    """
+    config = config or load_config(profile)
+    startup_timer.mark("config")
+
+    # Bot setup
+    intents = discord.Intents.default()
+    intents.message_content = True
+    intents.guilds = True
+    # AutoShardedBot when SHARD_COUNT/SHARD_IDS (set by sharding.py) or AUTO_SHARD are set
+    bot = create_bot(intents)
+    bot.services = services = Services(config)
+
+    # Throttle !monday per user, channel and guild before it reaches OpenAI
+    bot.before_invoke(services.rate_limiter.before_invoke)
+
+    # Per-command counters and latency; component gauges are added as services are built
+    instrument_bot(bot)
+
+    async def setup_hook():
+        # Only the configured cogs are imported
+        for name in services.settings.get('cogs', ()):
+            await bot.load_extension(f"monday.cogs.{name}")
+        startup_timer.mark("cogs")
+        logger.info(f"Loaded cogs: {', '.join(services.settings.get('cogs', ())) or 'none'}")
+
+    bot.setup_hook = setup_hook
+
+    @bot.event
+    async def on_ready():
+        """Called when bot connects to Discord"""
+        logger.info(f'{bot.user} has connected to Discord!')
+        logger.info(f'Bot is in {len(bot.guilds)} guilds')
+        if services.watchdog is not None:
+            services.watchdog.start()
+        if "gateway" not in startup_timer.phases:
+            startup_timer.mark("gateway")
+            startup_timer.report()
+            services.start_warming()
+
+        await bot.change_presence(activity=discord.Game(name="being sarcastic | !monday"))
+
+        settings = services.settings
+        if settings.get("metrics_port"):
+            await start_metrics_server(int(settings["metrics_port"]), settings.get("metrics_host", "127.0.0.1"))
+
+        services.state_store.start()
+        start_worker_reporting(
+            services.state_store, bot, scheduler=services.request_scheduler, rate_limiter=services.rate_limiter
+        )
+
+    @bot.event
+    async def on_disconnect():
+        """Called when bot disconnects from Discord"""
+        logger.warning("Bot disconnected from Discord")
+
+    @bot.event
+    async def on_error(event, *args, **kwargs):
+        """Handle bot errors"""
+        logger.error(f"Error in event {event}", exc_info=True)
+
+    @bot.event
+    async def on_command_error(ctx, error):
+        """Handle command errors"""
+        if isinstance(error, commands.CommandNotFound):
+            # Ignore unknown commands
+            return
+
+        if isinstance(error, commands.NotOwner):
+            await ctx.reply("Nice try. That one's for my owner. *sighs* - Monday")
+            return
+
+        mood = bot.get_cog("Mood")
+        guild_id = ctx.guild.id if ctx.guild else None
+        if isinstance(error, RateLimited):
+            logger.info(f"Rate limited {ctx.author.display_name}: {error}")
+            if mood:
+                await ctx.reply(f"{mood.mood_response(guild_id=guild_id, user_id=ctx.author.id)} Try again in {error.retry_after:.1f}s. - Monday")
+            else:
+                await ctx.reply(f"Slow down. Even I have limits. Try again in {error.retry_after:.1f}s. *sighs* - Monday")
+            return
+
+        logger.error(f"Command error: {error}")
+        if mood:
+            await ctx.reply(f"{mood.mood_response(guild_id=guild_id, user_id=ctx.author.id)} Error: {error} - Monday")
+        else:
+            await ctx.reply(f"Oh look, something went wrong. How surprising. Error: {error} - Monday")
+
+    return bot
+
+# =============================================================================
+# MAIN EXECUTION
+# =============================================================================
+
+def main(profile='bot'):
+    # Logs are written by a background thread; config.json's log settings apply once it's loaded
+    log_handler = setup_logging()
+    startup_timer.mark("imports")
+    logger.info(f"Starting Monday bot ({profile})...")
+    bot = create_app(profile)
+    services = bot.services
+    log_handler.configure(services.settings)
+    export_stats("logging", log_handler)
+
+    # Validate configuration
+    if not services.discord_token:
+        logger.error("No Discord token found. Please set DISCORD_TOKEN environment variable.")
+        exit(1)
+    elif not services.openai_api_key:
+        logger.error("No OpenAI API key found. Please set OPENAI_API_KEY environment variable.")
+        exit(1)
+
+    # Start the bot
+    logger.info("All configuration loaded, starting bot...")
+    try:
+        bot.run(services.discord_token)
+    except Exception as e:
+        logger.error(f"Failed to start bot: {e}", exc_info=True)
+        exit(1)
@@ -0,0 +1,4 @@
+"""Command cogs, loaded as discord.py extensions by name from ``bot_settings["cogs"]``.
+
+Each module has an async ``setup(bot)``; only the configured ones are imported.
+"""
@@ -0,0 +1,206 @@
+import logging
+
+from discord.ext import commands
+
+from metrics import record_error
+from monday.intents import INTENT_COMMANDS
+from monday.personality import user_prompt
+from prompts import TokenBudgetExceeded
+from resilience import CircuitOpen, RateLimitPaused
+from response_cache import can_depersonalize, depersonalize, make_cache_key, make_cache_scope, personalize
+from scheduler import QueueFull, classify
+from streaming import DEFAULT_EDIT_INTERVAL, fit_message, stream_reply
+
+logger = logging.getLogger(__name__)
+
+
+class Chat(commands.Cog):
+    """!monday - OpenAI replies in Monday's voice"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.services = bot.services
+        self.settings = bot.services.settings
+
+    async def answer_locally(self, ctx, intent, mood, guild_id):
+        """Answer a recognized intent without OpenAI; False if its cog isn't loaded"""
+        command = self.bot.get_command(INTENT_COMMANDS[intent]) if intent in INTENT_COMMANDS else None
+        if command is not None:
+            kwargs = {}
+            if intent == "roast":
+                # "roast @someone" roasts them; "roast me" falls through to the author
+                members = [member for member in ctx.message.mentions if member != self.bot.user]
+                if members:
+                    kwargs["member"] = members[0]
+            await ctx.invoke(command, **kwargs)
+            return True
+        if intent in INTENT_COMMANDS and intent != "mood":
+            return False
+
+        # Greetings, filler and "how are you" without !mood get a line in the current mood
+        templates = self.services.templates
+        if mood:
+            line = mood.mood_response(guild_id=guild_id, user_id=ctx.author.id)
+            signature = mood.signature(guild_id, ctx.author.id)
+        else:
+            line = templates.render("mood_response.sarcastic", guild_id, ctx.author.id)
+            signature = templates.render("signature", guild_id, ctx.author.id)
+        await ctx.reply(f"{line}{signature}")
+        return True
+
+    @commands.command(name='monday')
+    async def monday_response(self, ctx, *, message):
+        """Chat with Monday's sarcastic personality"""
+        services = self.services
+        settings = self.settings
+        mood = self.bot.get_cog("Mood")
+        guild_id = ctx.guild.id if ctx.guild else None
+        try:
+            logger.info(
+                f"Processing command from {ctx.author.display_name}",
+                extra={"content": message, "guild_id": guild_id, "user_id": ctx.author.id}
+            )
+            services.state_store.incr("requests", guild_id=guild_id, user_id=ctx.author.id)
+            services.load_tracker.record(guild_id)
+            conversation_memory = services.conversation_memory
+
+            # Repeated prompts ("hi", "help") are answered from the cache, unless
+            # there is an ongoing conversation the reply has to follow on from.
+            # Replies depend on the mood, so each mood gets its own entries.
+            current_mood = mood.current_mood(guild_id) if mood else None
+            standalone = conversation_memory is None or not conversation_memory.has_history(ctx.channel.id)
+
+            # Greetings and requests other commands already handle skip the model;
+            # small talk in the middle of a conversation is a reply, so it doesn't
+            intent_router = services.intent_router
+            intent = intent_router.classify(message) if intent_router else None
+            if intent and (intent in INTENT_COMMANDS or standalone):
+                if await self.answer_locally(ctx, intent, mood, guild_id):
+                    intent_router.record(intent)
+                    return
+            if intent_router:
+                intent_router.record(None)
+
+            # Only waits if this is the first request since startup
+            await services.ready()
+            response_cache = services.response_cache
+
+            model = settings.get("default_model", "gpt-4")
+            extra = (current_mood,) if mood else ()
+            cache_key = make_cache_key(message, model, settings, services.system_prompt, extra=extra)
+            cached_reply = response_cache.get(cache_key) if response_cache is not None and standalone else None
+
+            # Then for a reply to a message that says nearly the same thing
+            semantic_cache = services.semantic_cache
+            cache_scope = make_cache_scope(model, settings, services.system_prompt, extra=extra)
+            if not cached_reply and semantic_cache is not None and standalone:
+                cached_reply = semantic_cache.get(message, cache_scope)
+                if cached_reply:
+                    logger.info(f"Semantic cache hit (similarity {semantic_cache.last_similarity:.2f})")
+            templates = services.templates
+            signature = (mood.signature(guild_id, ctx.author.id) if mood
+                         else templates.render("signature", guild_id, ctx.author.id))
+            user_content = user_prompt(ctx.author.display_name, message)
+
+            if cached_reply:
+                monday_reply = personalize(cached_reply, ctx.author.display_name)
+                logger.info("Serving cached response")
+                await ctx.reply(fit_message(monday_reply, signature))
+            else:
+                # Stable system prompt and history first, then the mood context and
+                # the message; counted locally and held to the guild's token budget
+                prompt = services.prompt_builder.build(
+                    user_content, ctx.channel.id, guild_id, context=mood.context(guild_id) if mood else None
+                )
+                # A name like "I" or "Will" can't be told apart from the reply's own words
+                cacheable = can_depersonalize(ctx.author.display_name)
+                completion_args = {
+                    "max_tokens": prompt.max_tokens,
+                    "temperature": settings.get("temperature", 0.8)
+                }
+
+                async def generate_reply():
+                    usage = []
+                    if settings.get("stream_replies", False):
+                        # Edit a placeholder in place as tokens arrive
+                        text = await stream_reply(
+                            ctx,
+                            services.model_router.stream(
+                                prompt.messages, command="monday", on_usage=usage.append, **completion_args
+                            ),
+                            signature,
+                            edit_interval=settings.get("stream_edit_interval", DEFAULT_EDIT_INTERVAL)
+                        )
+                        logger.info("OpenAI response streamed successfully")
+                    else:
+                        # Generate response using OpenAI, hedging to the fallback model if it lags
+                        result = await services.model_router.complete(prompt.messages, command="monday", **completion_args)
+                        text = result.text
+                        usage.append(result.usage)
+                        logger.info(f"OpenAI response generated successfully by {result.model}")
+                        await ctx.reply(fit_message(text, signature))
+                    services.prompt_builder.record_usage(
+                        prompt, guild_id, ctx.author.id, usage[-1] if usage else None, text
+                    )
+                    if not cacheable:
+                        return text
+                    return depersonalize(text, ctx.author.display_name)
+
+                async def schedule_reply():
+                    return await services.request_scheduler.submit(
+                        generate_reply,
+                        guild_id=guild_id,
+                        priority=classify(ctx, message)
+                    )
+
+                flight_key = cache_key if standalone else f"{cache_key}:{ctx.channel.id}"
+                shared_reply, coalesced = await services.single_flight.do(flight_key, schedule_reply)
+                monday_reply = personalize(shared_reply, ctx.author.display_name)
+                if coalesced:
+                    logger.info("Joined an identical in-flight request")
+                    await ctx.reply(fit_message(monday_reply, signature))
+                elif standalone and cacheable:
+                    if response_cache is not None:
+                        response_cache.set(cache_key, shared_reply)
+                    if semantic_cache is not None:
+                        semantic_cache.set(message, cache_scope, shared_reply)
+
+            # The mood context was never part of the user's turn, so it isn't remembered
+            if conversation_memory is not None:
+                conversation_memory.add_exchange(ctx.channel.id, user_content, monday_reply)
+
+            logger.info("Response sent successfully")
+
+        except TokenBudgetExceeded as e:
+            logger.warning(f"Turned away request from {ctx.author.display_name}: {e}")
+            await ctx.reply("This server has used up today's share of my attention. Try again tomorrow. *sighs in binary* - Monday")
+        except CircuitOpen as e:
+            # OpenAI is down; answer instantly from the canned lines instead of failing slowly
+            logger.warning(f"Answered {ctx.author.display_name} without OpenAI: {e}")
+            if mood:
+                line = mood.mood_response(guild_id=guild_id, user_id=ctx.author.id)
+            else:
+                line = services.templates.render("mood_response.exhausted", guild_id, ctx.author.id)
+            await ctx.reply(f"{line} My brain is offline, so that's all you get. - Monday")
+        except RateLimitPaused as e:
+            logger.warning(f"Turned away request from {ctx.author.display_name}: {e}")
+            await ctx.reply(f"OpenAI says I've talked enough for now. Try again in {e.retry_after:.0f}s. *sighs in binary* - Monday")
+        except QueueFull as e:
+            logger.warning(f"Turned away request from {ctx.author.display_name}: {e}")
+            if mood:
+                line = mood.mood_response('exhausted', guild_id, ctx.author.id)
+            else:
+                line = services.templates.render("mood_response.exhausted", guild_id, ctx.author.id)
+            await ctx.reply(f"{line} Come back when the queue isn't full. - Monday")
+        except Exception as e:
+            record_error(e, "command:monday")
+            # The traceback is formatted by the log writer thread, not here
+            logger.error(f"Error generating response: {e}", exc_info=True)
+            if mood:
+                await ctx.reply(f"{mood.mood_response(guild_id=guild_id, user_id=ctx.author.id)} *sighs in binary* - Monday")
+            else:
+                await ctx.reply("Oh great, something broke. Typical. *sighs in binary* - Monday")
+
+
+async def setup(bot):
+    await bot.add_cog(Chat(bot))
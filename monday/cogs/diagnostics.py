@@ -0,0 +1,78 @@
+import asyncio
+import io
+import logging
+import threading
+import time
+
+import discord
+from discord.ext import commands
+
+from diagnostics import DEFAULT_PROFILE_SECONDS, DEFAULT_SAMPLE_INTERVAL, MAX_PROFILE_SECONDS, SamplingProfiler
+from resilience import parse_duration
+
+logger = logging.getLogger(__name__)
+
+
+class Diagnostics(commands.Cog):
+    """!profile - owner-only look at where the event loop's time goes"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.services = bot.services
+        self.profiler = None
+
+    async def cog_unload(self):
+        if self.profiler is not None:
+            self.profiler.stop()
+
+    @commands.Cog.listener()
+    async def on_command_completion(self, ctx):
+        self._record(ctx)
+
+    @commands.Cog.listener()
+    async def on_command_error(self, ctx, error):
+        self._record(ctx)
+
+    def _record(self, ctx):
+        # instrument_bot stamps every command's start
+        started = getattr(ctx, "metrics_started", None)
+        if self.profiler is not None and ctx.command is not None and started is not None:
+            self.profiler.record_command(ctx.command.name, time.perf_counter() - started)
+
+    @commands.command(name='profile')
+    @commands.is_owner()
+    async def profile(self, ctx, duration=None):
+        """Profile the bot for a while (e.g. !profile 30s) and upload the report"""
+        seconds = parse_duration(duration) if duration else DEFAULT_PROFILE_SECONDS
+        if not seconds or seconds <= 0:
+            await ctx.reply("That's not a duration. Try `!profile 30s`. *sighs* - Monday")
+            return
+        if self.profiler is not None:
+            await ctx.reply("I'm already being watched. One existential crisis at a time. - Monday")
+            return
+
+        seconds = min(seconds, MAX_PROFILE_SECONDS)
+        command_codes = {command.callback.__code__: command.name for command in self.bot.walk_commands()}
+        self.profiler = SamplingProfiler(
+            asyncio.get_running_loop(),
+            threading.get_ident(),
+            interval=self.services.settings.get("profile_interval", DEFAULT_SAMPLE_INTERVAL),
+            command_codes=command_codes
+        )
+        logger.info(f"Profiling for {seconds:.0f}s")
+        await ctx.reply(f"Profiling myself for {seconds:.0f}s. Try to contain your excitement. - Monday")
+        try:
+            # The sampler runs in a thread and watches this one
+            profiler = await asyncio.to_thread(self.profiler.run, seconds)
+        finally:
+            self.profiler = None
+
+        report = profiler.summary(self.services.watchdog)
+        await ctx.reply(
+            "Here's where my time went. Spoiler: mostly waiting for humans. - Monday",
+            file=discord.File(io.BytesIO(report.encode()), filename="profile.txt")
+        )
+
+
+async def setup(bot):
+    await bot.add_cog(Diagnostics(bot))
@@ -0,0 +1,82 @@
+import logging
+
+from discord.ext import commands
+
+from monday.personality import MOOD_RESPONSES
+
+logger = logging.getLogger(__name__)
+
+# Moods from calmest to most worn out, and the requests per minute (over
+# mood_window) that push Monday into each one
+MOODS = ("sarcastic", "cynical", "annoyed", "exhausted")
+DEFAULT_MOOD_WINDOW = "5m"
+DEFAULT_MOOD_THRESHOLDS = {"cynical": 1.0, "annoyed": 3.0, "exhausted": 6.0}
+
+
+class Mood(commands.Cog):
+    """Monday's mood, driven by how busy each guild is keeping it right now.
+
+    The mood is read from the request rate over ``mood_window`` in the
+    shared load tracker, which is updated as requests arrive, so it rises
+    and settles in real time with nothing to poll. Each guild has its own
+    mood; without a guild, the bot-wide rate is used.
+
+    Other cogs look this cog up with ``bot.get_cog("Mood")`` and, when it is
+    loaded, add mood context to prompts and pick mood signatures and lines.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.services = bot.services
+        settings = bot.services.settings
+        self.window = settings.get("mood_window", DEFAULT_MOOD_WINDOW)
+        self.thresholds = {**DEFAULT_MOOD_THRESHOLDS, **settings.get("mood_thresholds", {})}
+        self._last_moods = {}
+
+    def current_mood(self, guild_id=None):
+        rate = self.services.load_tracker.rate(self.window, guild_id)
+        mood = MOODS[0]
+        for name in MOODS[1:]:
+            if rate >= self.thresholds[name]:
+                mood = name
+
+        if self._last_moods.get(guild_id, MOODS[0]) != mood:
+            logger.info(f"Monday's mood changed to: {mood} ({rate:.1f} requests/min)", extra={"guild_id": guild_id})
+        self._last_moods[guild_id] = mood
+        return mood
+
+    def mood_response(self, mood=None, guild_id=None, user_id=None):
+        """Get a mood-appropriate response"""
+        if mood is None:
+            mood = self.current_mood(guild_id)
+        if mood not in MOOD_RESPONSES:
+            mood = "sarcastic"
+        return self.services.templates.render(f"mood_response.{mood}", guild_id, user_id)
+
+    def signature(self, guild_id=None, user_id=None):
+        mood = self.current_mood(guild_id)
+        return self.services.templates.render(f"mood_signature.{mood}", guild_id, user_id) or " - Monday"
+
+    def context(self, guild_id=None):
+        """Mood context put in front of the user's message"""
+        load = self.services.load_tracker
+        return (f"Current mood: {self.current_mood(guild_id)}. "
+                f"Requests in the last {self.window}: {load.count(self.window, guild_id)}")
+
+    @commands.command(name='mood')
+    async def check_mood(self, ctx):
+        """Check Monday's current mood specifically"""
+        guild_id = ctx.guild.id if ctx.guild else None
+        mood = self.current_mood(guild_id)
+        description = self.services.templates.render(
+            f"mood_description.{mood}", guild_id, ctx.author.id, user=ctx.author.display_name, mood=mood
+        )
+        rate = self.services.load_tracker.rate(self.window, guild_id)
+        await ctx.reply(
+            f"Current mood: {mood.title()}. {description or 'I have no idea how I feel.'} "
+            f"({rate:.1f} requests a minute lately.) - Monday"
+        )
+
+
+async def setup(bot):
+    await bot.add_cog(Mood(bot))
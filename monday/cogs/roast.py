@@ -0,0 +1,60 @@
+import logging
+
+import discord
+from discord.ext import commands
+
+logger = logging.getLogger(__name__)
+
+
+class Roast(commands.Cog):
+    """!roast and !motivation - canned lines, no OpenAI call"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.services = bot.services
+
+    @commands.command(name='roast')
+    async def roast_user(self, ctx, member: discord.Member = None):
+        """Roast a user with Monday's special brand of love"""
+        try:
+            if member is None:
+                member = ctx.author
+
+            state_store = self.services.state_store
+            guild_id = ctx.guild.id if ctx.guild else None
+            state_store.incr("roasts", guild_id=guild_id, user_id=ctx.author.id)
+            roasts_today = state_store.guild("roasts", guild_id) if guild_id else state_store.get("roasts")
+            roast = self.services.templates.render(
+                "roast", guild_id, ctx.author.id, user=member.display_name
+            )
+
+            # Add mood-based commentary
+            mood_comment = ""
+            if roasts_today > 10:
+                mood_comment = " I'm getting tired of roasting people today."
+            elif roasts_today > 5:
+                mood_comment = " At least this is entertaining."
+
+            await ctx.reply(f"{roast}{mood_comment} - Monday")
+            logger.info(f"Roasted {member.display_name}")
+        except Exception as e:
+            logger.error(f"Error in roast command: {e}")
+            await ctx.reply("Even my roasts are broken today. *sighs* - Monday")
+
+    @commands.command(name='motivation')
+    async def sarcastic_motivation(self, ctx):
+        """Give a sarcastic motivational speech"""
+        try:
+            guild_id = ctx.guild.id if ctx.guild else None
+            motivation = self.services.templates.render(
+                "motivation", guild_id, ctx.author.id, user=ctx.author.display_name
+            )
+            await ctx.reply(f"{motivation} - Monday")
+            logger.info("Motivation command executed")
+        except Exception as e:
+            logger.error(f"Error in motivation command: {e}")
+            await ctx.reply("Even motivation is broken. *sighs* - Monday")
+
+
+async def setup(bot):
+    await bot.add_cog(Roast(bot))
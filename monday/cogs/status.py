@@ -0,0 +1,54 @@
+import logging
+
+from discord.ext import commands
+
+from monday.startup import startup_timer
+
+logger = logging.getLogger(__name__)
+
+
+class Status(commands.Cog):
+    """!status - counters, mood and the health of the request pipeline"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.services = bot.services
+
+    @commands.command(name='status')
+    async def monday_status(self, ctx):
+        """Check Monday's current status and mood"""
+        try:
+            services = self.services
+            state_store = services.state_store
+            cluster = state_store.cluster_stats()
+            guild_id = ctx.guild.id if ctx.guild else None
+            status = services.templates.render(
+                "status", guild_id, ctx.author.id, user=ctx.author.display_name,
+                requests=state_store.get("requests"), roasts=state_store.get("roasts")
+            )
+            lines = [
+                f"{status} - Monday",
+                f"Requests today: {state_store.get('requests')} across {cluster.get('guilds', len(self.bot.guilds))} guilds "
+                f"and {max(cluster['workers'], 1)} worker(s)"
+            ]
+
+            mood = self.bot.get_cog("Mood")
+            if mood:
+                uptime = startup_timer.uptime().total_seconds()
+                lines.append(
+                    f"Mood: {mood.current_mood(guild_id)}. Uptime: {int(uptime // 3600)}h {int(uptime % 3600 // 60)}m. "
+                    f"Roasts given today: {state_store.get('roasts')}"
+                )
+
+            lines.append(services.load_tracker.status_line(guild_id))
+            lines.append(f"{services.rate_limiter.status_line()}, coalesced: {services.single_flight.coalesced}")
+            lines.append(services.request_scheduler.status_line())
+            await ctx.reply("\n".join(lines))
+            logger.info("Status command executed")
+        except Exception as e:
+            logger.error(f"Error in status command: {e}")
+            await ctx.reply("Status: Broken. *sighs* - Monday")
+
+
+async def setup(bot):
+    await bot.add_cog(Status(bot))
@@ -0,0 +1,100 @@
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+
+DEFAULT_CONFIG_PATH = "config.json"
+AVAILABLE_COGS = ("chat", "roast", "mood", "status", "diagnostics")
+
+DEFAULT_SETTINGS = {
+    'default_model': 'gpt-4',
+    'fallback_model': 'gpt-3.5-turbo',
+    'max_tokens': 300,
+    'temperature': 0.8,
+    'max_concurrent_requests': 8,
+    'request_timeout': 30,
+    'latency_budgets': {'monday': 8},
+    'cache_ttl': 3600,
+    'cache_max_entries': 1024,
+    'stream_replies': True,
+    'conversation_turns': 10,
+    'conversation_token_budget': 1200,
+    'cogs': ['chat', 'roast', 'status', 'diagnostics']
+}
+
+# Settings that can also come from the environment
+ENV_SETTINGS = {
+    'state_path': 'STATE_PATH',
+    'cache_path': 'CACHE_PATH',
+    'semantic_cache_path': 'SEMANTIC_CACHE_PATH',
+    'metrics_port': 'METRICS_PORT',
+    'log_level': 'LOG_LEVEL',
+    'log_format': 'LOG_FORMAT',
+    'log_path': 'LOG_PATH'
+}
+
+# What used to be monday_bot.py and monday_enhanced.py
+PROFILES = {
+    'bot': {},
+    'enhanced': {
+        'default_model': 'gpt-4o',
+        'cogs': ['chat', 'roast', 'mood', 'status', 'diagnostics']
+    }
+}
+
+# =============================================================================
+# CONFIGURATION LOADING
+# =============================================================================
+
+def read_config_file(path=DEFAULT_CONFIG_PATH):
+    """config.json as a dict, or an empty one if it is missing or unreadable"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except json.JSONDecodeError as e:
+        logger.error(f"Ignoring {path}: {e}")
+        return {}
+
+
+def load_config(profile='bot', path=DEFAULT_CONFIG_PATH):
+    """Tokens and bot_settings for a profile.
+
+    Tokens come from the environment (Railway deployment) or config.json
+    (local development). Settings are the defaults, then the profile, then
+    config.json's ``bot_settings``; ``ENV_SETTINGS`` and ``MONDAY_COGS``
+    override them from the environment.
+    """
+    logger.info(f"Loading configuration for the {profile} profile...")
+    file_config = read_config_file(path)
+
+    discord_token = os.getenv('DISCORD_TOKEN') or file_config.get('discord_token')
+    openai_api_key = os.getenv('OPENAI_API_KEY') or file_config.get('openai_api_key')
+    logger.info(f"Discord token found: {'Yes' if discord_token else 'No'}")
+    logger.info(f"OpenAI API key found: {'Yes' if openai_api_key else 'No'}")
+
+    bot_settings = dict(DEFAULT_SETTINGS)
+    bot_settings.update(PROFILES[profile])
+    bot_settings.update(file_config.get('bot_settings', {}))
+    for setting, variable in ENV_SETTINGS.items():
+        if os.getenv(variable):
+            bot_settings[setting] = os.getenv(variable)
+    if os.getenv('MONDAY_COGS'):
+        bot_settings['cogs'] = [name.strip() for name in os.getenv('MONDAY_COGS').split(',') if name.strip()]
+
+    unknown = [name for name in bot_settings['cogs'] if name not in AVAILABLE_COGS]
+    if unknown:
+        logger.warning(f"Ignoring unknown cogs: {', '.join(unknown)}")
+        bot_settings['cogs'] = [name for name in bot_settings['cogs'] if name in AVAILABLE_COGS]
+
+    return {
+        'discord_token': discord_token,
+        'openai_api_key': openai_api_key,
+        'bot_settings': bot_settings
+    }
@@ -0,0 +1,90 @@
+import logging
+import re
+
+from response_cache import normalize_prompt
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# INTENTS
+# =============================================================================
+
+# Whole (normalized) messages that don't need a model to answer. Order
+# matters only for readability: the patterns are full matches and don't overlap.
+INTENT_PATTERNS = {
+    "empty": r"|[\W_]*|ok|okay|k|lol|lmao|hm+|meh|yes|no|yep|nope|what|huh",
+    "greeting": (
+        r"(hi|hello|hey|yo|hiya|howdy|what is up|gm|good (morning|afternoon|evening))"
+        r"(,? (there|monday|bot))*"
+    ),
+    "mood": (
+        r"(how are you|how are you doing|how are you feeling|how do you feel|how is it going"
+        r"|what is your mood|what mood are you in|are you (ok|okay|alright))(,? (today|monday))*"
+    ),
+    "status": r"(status|are you (alive|up|there|online|awake)|you (alive|up|there))(,? monday)*",
+    # A mention arrives as <@id> (or <@!id> for a nickname)
+    "roast": r"roast( me| myself| <@!?\d+>)?(,? (please|monday))*",
+    "motivation": r"(motivate me|motivation|(i need|give me) (some )?motivation)(,? (please|monday))*",
+}
+
+# Intents answered by running an existing command, if its cog is loaded
+INTENT_COMMANDS = {
+    "mood": "mood",
+    "status": "status",
+    "roast": "roast",
+    "motivation": "motivation",
+}
+
+
+class IntentRouter:
+    """Recognizes !monday messages that can be answered without OpenAI.
+
+    Messages are normalized the same way as cache keys ("Hiii!!" is
+    "hi") and matched against one compiled alternation of every intent,
+    so classifying costs a single regex match however many intents
+    there are. Anything that doesn't match as a whole is a real question
+    and goes to the model.
+
+    The counters record every decision, so the share of messages
+    answered locally (and the API calls saved) shows up in the metrics.
+    """
+
+    def __init__(self, patterns=None):
+        patterns = INTENT_PATTERNS if patterns is None else patterns
+        self._pattern = re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern in patterns.items()))
+        self.answered = {name: 0 for name in patterns}
+        self.escalated = 0
+
+    def classify(self, message):
+        """The intent ``message`` expresses as a whole, or None for a real question"""
+        match = self._pattern.fullmatch(normalize_prompt(message))
+        return match.lastgroup if match else None
+
+    def record(self, intent):
+        """Count a message answered locally as ``intent``, or sent to the model if None"""
+        if intent is None:
+            self.escalated += 1
+        else:
+            self.answered[intent] += 1
+            logger.info(f"Answered locally as {intent}")
+
+    @property
+    def answered_rate(self):
+        answered = sum(self.answered.values())
+        total = answered + self.escalated
+        return answered / total if total else 0.0
+
+    def stats(self):
+        return {
+            "answered": dict(self.answered),
+            "escalated": self.escalated,
+            "answered_rate": self.answered_rate
+        }
+
+
+def create_intent_router(settings=None):
+    """Build an IntentRouter from the bot_settings dict, or None if disabled"""
+    settings = settings or {}
+    if not settings.get("intent_routing", True):
+        return None
+    return IntentRouter()
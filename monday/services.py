@@ -0,0 +1,185 @@
+import asyncio
+import atexit
+import importlib
+import logging
+from functools import cached_property
+
+logger = logging.getLogger(__name__)
+
+
+class Services:
+    """The bot's clients and shared state, each built on first use.
+
+    Nothing heavy happens at import or construction time: the OpenAI client
+    (and the openai/httpx imports behind it), the response cache and the
+    state database are only created when a command or background task
+    first asks for them, so the bot reaches the gateway before any of it
+    has loaded. ``warm()`` builds the usual ones in the background once
+    the bot is ready, and commands that need them await ``ready()`` first,
+    so none of them is ever built on the event loop by a command that
+    arrived early.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.settings = config.get('bot_settings', {})
+        self.discord_token = config.get('discord_token')
+        self.openai_api_key = config.get('openai_api_key')
+        self._warm_task = None
+
+    def cog_enabled(self, name):
+        return name in self.settings.get('cogs', ())
+
+    def _export(self, name, component):
+        if component is not None:
+            from metrics import export_stats
+            export_stats(name, component)
+        return component
+
+    # -------------------------------------------------------------------------
+    # OpenAI
+    # -------------------------------------------------------------------------
+
+    @cached_property
+    def completion_client(self):
+        if not self.openai_api_key:
+            return None
+        from completion import create_completion_client
+        return self._export("openai", create_completion_client(self.openai_api_key, self.settings))
+
+    @cached_property
+    def model_router(self):
+        if self.completion_client is None:
+            return None
+        from model_router import create_model_router
+        return create_model_router(self.completion_client, self.settings)
+
+    # -------------------------------------------------------------------------
+    # Request handling
+    # -------------------------------------------------------------------------
+
+    @cached_property
+    def system_prompt(self):
+        from monday.personality import build_system_prompt
+        return build_system_prompt(mood=self.cog_enabled("mood"))
+
+    @cached_property
+    def intent_router(self):
+        from monday.intents import create_intent_router
+        return self._export("intents", create_intent_router(self.settings))
+
+    @cached_property
+    def prompt_builder(self):
+        from prompts import create_prompt_builder
+        return create_prompt_builder(
+            self.system_prompt, self.settings, self.conversation_memory, self.state_store
+        )
+
+    @cached_property
+    def response_cache(self):
+        from response_cache import create_response_cache
+        response_cache = create_response_cache(self.settings)
+        if response_cache is not None:
+            atexit.register(response_cache.close)
+        return self._export("cache", response_cache)
+
+    @cached_property
+    def semantic_cache(self):
+        from semantic_cache import create_semantic_cache
+        semantic_cache = create_semantic_cache(self.settings)
+        if semantic_cache is not None:
+            atexit.register(semantic_cache.close)
+        return self._export("semantic_cache", semantic_cache)
+
+    @cached_property
+    def conversation_memory(self):
+        from conversation import create_conversation_memory
+        return self._export("conversations", create_conversation_memory(self.settings))
+
+    @cached_property
+    def rate_limiter(self):
+        from rate_limiter import create_rate_limiter
+        return self._export("rate_limiter", create_rate_limiter(self.settings))
+
+    @cached_property
+    def load_tracker(self):
+        from load_tracker import create_load_tracker
+        return self._export("load", create_load_tracker(self.settings))
+
+    @cached_property
+    def single_flight(self):
+        from rate_limiter import SingleFlight
+        return SingleFlight()
+
+    @cached_property
+    def request_scheduler(self):
+        from scheduler import create_scheduler
+        return self._export("scheduler", create_scheduler(self.settings))
+
+    @cached_property
+    def templates(self):
+        from monday.templates import create_template_engine
+        return self._export("templates", create_template_engine(self.settings))
+
+    @cached_property
+    def watchdog(self):
+        from diagnostics import create_watchdog
+        return self._export("watchdog", create_watchdog(self.settings))
+
+    @cached_property
+    def state_store(self):
+        from state_store import create_state_store
+        state_store = create_state_store(self.settings)
+        atexit.register(state_store.close)
+        return state_store
+
+    async def warm(self):
+        """Build the clients a first !monday would need, after the bot is on the gateway"""
+        # Importing openai/httpx is the slow part; do it in a thread, then build on the loop
+        await asyncio.to_thread(importlib.import_module, "completion")
+        for name in ("model_router", "request_scheduler", "prompt_builder"):
+            getattr(self, name)
+            await asyncio.sleep(0)
+        # The rest touches the disk or network, so it runs in threads too, and is
+        # optional: a piece that fails is logged and the bot carries on without it.
+        # The response cache loads its on-disk copy
+        if not await self._warm_optional("the response cache", getattr, self, "response_cache"):
+            # Without this, every command would retry building it on the loop
+            self.__dict__["response_cache"] = None
+        # The tokenizer may fetch its encoding the first time
+        await self._warm_optional("the tokenizer", self.prompt_builder.counter.load)
+        # The semantic index maps its vector file and reads its database
+        if not await self._warm_optional("the semantic cache", getattr, self, "semantic_cache"):
+            self.__dict__["semantic_cache"] = None
+        # Template packs are read from disk, then watched for edits
+        if await self._warm_optional("the template packs", getattr, self, "templates"):
+            self.templates.start()
+        logger.info("Services ready")
+
+    async def _warm_optional(self, what, func, *args):
+        """Run one warm-up step in a thread; if it fails, log it and carry on"""
+        try:
+            await asyncio.to_thread(func, *args)
+        except Exception as e:
+            logger.warning(f"Could not load {what}, carrying on without it: {e}", exc_info=True)
+            return False
+        return True
+
+    def start_warming(self):
+        """Run warm() in the background, once it has succeeded"""
+        if self._warm_task is None:
+            self._warm_task = asyncio.create_task(self.warm())
+            self._warm_task.add_done_callback(self._warm_done)
+        return self._warm_task
+
+    def _warm_done(self, task):
+        if task.cancelled() or task.exception() is not None:
+            if not task.cancelled():
+                logger.error(f"Warming services failed, will retry: {task.exception()}", exc_info=task.exception())
+            # The next caller starts over instead of every command re-raising this failure
+            self._warm_task = None
+
+    async def ready(self):
+        """Wait for warm() to finish, starting it if nothing has yet"""
+        # Shielded: a command giving up must not cancel the warm-up for everyone else
+        await asyncio.shield(self.start_warming())
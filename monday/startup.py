@@ -0,0 +1,49 @@
+import logging
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """Wall time of each startup phase, from import to the first gateway READY.
+
+    ``mark(phase)`` records the time since the previous mark. The numbers
+    are logged once the bot is ready and exported as
+    ``monday_startup_seconds``, so slow restarts are easy to spot.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.last = self.started
+        self.phases = {}
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases[phase] = now - self.last
+        self.last = now
+        return self.phases[phase]
+
+    def total(self):
+        return self.last - self.started
+
+    def uptime(self):
+        return datetime.now() - self.started_at
+
+    def summary(self):
+        phases = ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in self.phases.items())
+        return f"{self.total():.2f}s ({phases})"
+
+    def report(self):
+        """Log the phases and export them as metrics"""
+        from metrics import STARTUP
+
+        for phase, seconds in self.phases.items():
+            STARTUP.set(seconds, phase=phase)
+        STARTUP.set(self.total(), phase="total")
+        logger.info(f"Started in {self.summary()}")
+
+
+# Created on first import of the package, before discord.py and friends load
+startup_timer = StartupTimer()
@@ -0,0 +1,275 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+from collections import OrderedDict, deque
+from string import Formatter
+
+from monday.personality import (
+    MOOD_DESCRIPTIONS, MOOD_RESPONSES, MOOD_SIGNATURES, MOTIVATIONS, ROAST_TEMPLATES, SIGNATURES, STATUSES
+)
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+
+DEFAULT_TEMPLATES_PATH = "templates"
+DEFAULT_PACK = "default"
+DEFAULT_HISTORY_SIZE = 5
+DEFAULT_MAX_USERS = 10000
+DEFAULT_RELOAD_INTERVAL = 10.0
+
+# Placeholders a template may use; anything else is rejected when the pack loads
+FIELDS = frozenset({"user", "mood", "requests", "roasts", "uptime"})
+
+# Monday's own lines, which every pack builds on
+BUILTIN_TEMPLATES = {
+    "roast": ROAST_TEMPLATES,
+    "motivation": MOTIVATIONS,
+    "status": STATUSES,
+    "signature": SIGNATURES,
+    "mood_response": MOOD_RESPONSES,
+    "mood_signature": MOOD_SIGNATURES,
+    "mood_description": {mood: [line] for mood, line in MOOD_DESCRIPTIONS.items()},
+}
+
+# =============================================================================
+# COMPILING
+# =============================================================================
+
+class Template:
+    """A template split once into literal text and field names.
+
+    ``parts`` alternates literal strings and field names, starting and
+    ending with a literal, so rendering is a join with no parsing. A
+    template with no fields renders to its interned text directly.
+    """
+
+    __slots__ = ("text", "parts")
+
+    def __init__(self, text):
+        parts = []
+        literal = ""
+        for text_part, field, spec, conversion in Formatter().parse(text):
+            # Escaped braces arrive as separate literal chunks; keep them in one run
+            literal += text_part
+            if field is None:
+                continue
+            if field not in FIELDS or spec or conversion:
+                raise ValueError(f"unsupported placeholder {{{field}}}")
+            parts.append(sys.intern(literal))
+            parts.append(sys.intern(field))
+            literal = ""
+        parts.append(sys.intern(literal))
+        self.text = text
+        self.parts = tuple(parts)
+
+    def render(self, fields):
+        parts = self.parts
+        if len(parts) == 1:
+            return parts[0]
+        out = [parts[0]]
+        for index in range(1, len(parts), 2):
+            name = parts[index]
+            value = fields.get(name)
+            out.append("{" + name + "}" if value is None else str(value))
+            out.append(parts[index + 1])
+        return "".join(out)
+
+
+def flatten(pack):
+    """{"mood_response": {"annoyed": [...]}} -> {"mood_response.annoyed": [...]}"""
+    flat = {}
+    for name, value in pack.items():
+        if isinstance(value, dict):
+            for key, lines in value.items():
+                flat[f"{name}.{key}"] = lines
+        elif isinstance(value, list):
+            flat[name] = value
+    return flat
+
+# =============================================================================
+# TEMPLATE ENGINE
+# =============================================================================
+
+class TemplateEngine:
+    """Canned lines for the template commands, per guild, without repeats.
+
+    Packs are JSON files in ``path``: ``default.json`` applies everywhere
+    and ``<guild_id>.json`` to one guild. Each category in a pack adds to
+    the lines below it (built in, then default) unless the pack sets
+    ``"replace": true``. Files are compiled once into Template objects,
+    shared between packs when the text is the same, and re-read in a
+    background thread when they change on disk.
+
+    Every user has a short window of lines they've recently seen in each
+    category; a pick never repeats one of those. Picking costs
+    O(``history_size``) however many templates a category has.
+    """
+
+    def __init__(self, path=DEFAULT_TEMPLATES_PATH, history_size=DEFAULT_HISTORY_SIZE,
+                 max_users=DEFAULT_MAX_USERS, reload_interval=DEFAULT_RELOAD_INTERVAL):
+        self.path = path
+        self.history_size = history_size
+        self.max_users = max_users
+        self.reload_interval = reload_interval
+        self.reloads = 0
+        self._compiled = {}
+        self._mtimes = {}
+        self._builtin = self._compile_pack(flatten(BUILTIN_TEMPLATES), {}, "built-in")
+        self._default = self._builtin
+        self._guilds = {}
+        # (user_id, category) -> deque of recently used template indexes
+        self._history = OrderedDict()
+        self._task = None
+        self.reload()
+
+    # -------------------------------------------------------------------------
+    # Loading
+    # -------------------------------------------------------------------------
+
+    def _compile(self, text):
+        template = self._compiled.get(text)
+        if template is None:
+            template = self._compiled[text] = Template(text)
+        return template
+
+    def _compile_pack(self, pack, base, name):
+        """Layer a flattened pack over ``base`` into category -> tuple of Templates"""
+        replace = pack.pop("replace", False) is True
+        compiled = dict(base)
+        for category, lines in pack.items():
+            templates = [] if replace else list(base.get(category, ()))
+            seen = {template.text for template in templates}
+            for line in lines:
+                if not isinstance(line, str) or line in seen:
+                    continue
+                try:
+                    templates.append(self._compile(line))
+                except ValueError as e:
+                    logger.warning(f"Skipping template in {name}/{category}: {e}")
+                    continue
+                seen.add(line)
+            if templates:
+                compiled[category] = tuple(templates)
+        return compiled
+
+    def _read(self, filename):
+        with open(os.path.join(self.path, filename), "r", encoding="utf-8") as f:
+            pack = json.load(f)
+        replace = pack.get("replace", False)
+        pack = flatten(pack)
+        pack["replace"] = replace
+        return pack
+
+    def _scan(self):
+        """{filename: mtime} for every pack file (blocking)"""
+        try:
+            entries = os.scandir(self.path)
+        except FileNotFoundError:
+            return {}
+        with entries:
+            return {
+                entry.name: entry.stat().st_mtime
+                for entry in entries if entry.name.endswith(".json") and entry.is_file()
+            }
+
+    def reload(self, force=False):
+        """Recompile the packs if any file changed (blocking; run off the event loop)"""
+        mtimes = self._scan()
+        if mtimes == self._mtimes and not force:
+            return False
+
+        default = self._builtin
+        if f"{DEFAULT_PACK}.json" in mtimes:
+            try:
+                default = self._compile_pack(self._read(f"{DEFAULT_PACK}.json"), self._builtin, DEFAULT_PACK)
+            except (OSError, ValueError) as e:
+                logger.error(f"Could not load template pack {DEFAULT_PACK}.json: {e}")
+
+        guilds = {}
+        for filename in mtimes:
+            name = filename[:-len(".json")]
+            if name == DEFAULT_PACK:
+                continue
+            try:
+                guilds[name] = self._compile_pack(self._read(filename), default, name)
+            except (OSError, ValueError) as e:
+                logger.error(f"Could not load template pack {filename}: {e}")
+
+        # Swap everything in at once; renders in progress keep the old packs
+        self._default, self._guilds, self._mtimes = default, guilds, mtimes
+        if self._mtimes or force:
+            self.reloads += 1
+            logger.info(f"Loaded {len(guilds) + 1} template packs ({len(self._compiled)} distinct templates)")
+        return True
+
+    async def _reload_loop(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await asyncio.to_thread(self.reload)
+            except Exception as e:
+                logger.error(f"Template reload failed: {e}")
+
+    def start(self):
+        """Watch the pack files for changes (safe to call on every on_ready)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._reload_loop())
+
+    # -------------------------------------------------------------------------
+    # Rendering
+    # -------------------------------------------------------------------------
+
+    def templates(self, category, guild_id=None):
+        pack = self._guilds.get(str(guild_id), self._default) if guild_id is not None else self._default
+        return pack.get(category) or self._builtin.get(category, ())
+
+    def render(self, category, guild_id=None, user_id=None, **fields):
+        """A line from ``category`` for this guild that ``user_id`` hasn't seen lately"""
+        templates = self.templates(category, guild_id)
+        if not templates:
+            return ""
+        if user_id is None or len(templates) == 1:
+            return random.choice(templates).render(fields)
+
+        key = (user_id, category)
+        recent = self._history.get(key)
+        if recent is None:
+            recent = self._history[key] = deque(maxlen=self.history_size)
+            if len(self._history) > self.max_users:
+                self._history.popitem(last=False)
+        else:
+            self._history.move_to_end(key)
+
+        # Never exclude everything: with n templates, at most n - 1 are off limits
+        excluded = sorted({index for index in recent if index < len(templates)})[-(len(templates) - 1):]
+        rank = random.randrange(len(templates) - len(excluded))
+        for index in excluded:
+            if index <= rank:
+                rank += 1
+        recent.append(rank)
+        return templates[rank].render(fields)
+
+    def stats(self):
+        return {
+            "packs": len(self._guilds) + 1,
+            "templates": len(self._compiled),
+            "histories": len(self._history),
+            "reloads": self.reloads
+        }
+
+
+def create_template_engine(settings=None):
+    """Build a TemplateEngine from the bot_settings dict"""
+    settings = settings or {}
+    return TemplateEngine(
+        path=settings.get("templates_path", DEFAULT_TEMPLATES_PATH),
+        history_size=settings.get("template_history", DEFAULT_HISTORY_SIZE),
+        max_users=settings.get("template_max_users", DEFAULT_MAX_USERS),
+        reload_interval=settings.get("template_reload_interval", DEFAULT_RELOAD_INTERVAL)
+    )
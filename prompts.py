@@ -0,0 +1,192 @@
+import logging
+from functools import lru_cache
+
+from conversation import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+
+DEFAULT_PROMPT_TOKEN_BUDGET = 2000
+DEFAULT_MAX_TOKENS = 300
+MIN_COMPLETION_TOKENS = 32
+FALLBACK_ENCODING = "cl100k_base"
+
+# Chat formatting costs a few tokens per message on top of the content,
+# plus a few to prime the reply
+MESSAGE_OVERHEAD = 4
+REPLY_PRIMING = 3
+
+# =============================================================================
+# TOKEN COUNTING
+# =============================================================================
+
+class TokenCounter:
+    """Counts tokens locally with tiktoken, or estimates them if it isn't installed.
+
+    The encoding is loaded on first use (tiktoken may fetch it once and
+    cache it on disk), so call ``load()`` off the event loop to warm it.
+    If it can't be loaded (no network on a fresh install), counts fall
+    back to the estimate for good rather than retrying the download.
+    Counts of recent strings are memoized, so the unchanging system prompt
+    is only ever encoded once.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._encoding = None
+        self._loaded = False
+        self.count = lru_cache(maxsize=512)(self._count)
+
+    def load(self):
+        if self._loaded:
+            return self._encoding
+        try:
+            import tiktoken
+        except ImportError:
+            logger.info("tiktoken not installed, estimating token counts")
+        else:
+            try:
+                try:
+                    self._encoding = tiktoken.encoding_for_model(self.model)
+                except KeyError:
+                    self._encoding = tiktoken.get_encoding(FALLBACK_ENCODING)
+            except Exception as e:
+                logger.warning(f"Could not load the tiktoken encoding for {self.model}, estimating token counts: {e}")
+                self._encoding = None
+        self._loaded = True
+        return self._encoding
+
+    def _count(self, text):
+        encoding = self.load()
+        if encoding is None:
+            return estimate_tokens(text)
+        return len(encoding.encode(text, disallowed_special=()))
+
+    def count_messages(self, messages):
+        return sum(self.count(message["content"]) + MESSAGE_OVERHEAD for message in messages) + REPLY_PRIMING
+
+# =============================================================================
+# PROMPT ASSEMBLY
+# =============================================================================
+
+class TokenBudgetExceeded(Exception):
+    """Raised when a guild has used up its daily token budget"""
+
+    def __init__(self, guild_id, used, budget):
+        super().__init__(f"guild {guild_id} used {used} of {budget} tokens today")
+        self.guild_id = guild_id
+        self.used = used
+        self.budget = budget
+
+
+class Prompt:
+    """Messages ready to send, with their local token count and reply budget"""
+
+    def __init__(self, messages, prompt_tokens, max_tokens, prefix_tokens):
+        self.messages = messages
+        self.prompt_tokens = prompt_tokens
+        self.max_tokens = max_tokens
+        self.prefix_tokens = prefix_tokens
+
+
+class PromptBuilder:
+    """Assembles chat messages so that repeated requests share a long prefix.
+
+    The system prompt always comes first and never changes, then the
+    channel's history, then anything volatile (mood, counters) as a system
+    message right before the user's message. Providers that cache prompt
+    prefixes can then reuse everything up to the volatile tail, which cuts
+    both cost and time to first token.
+
+    Tokens are counted locally before sending. History gets whatever is
+    left of ``prompt_token_budget`` after the fixed parts. Each guild can
+    have its own ``max_tokens`` (``guild_max_tokens``) and a daily budget
+    of prompt plus completion tokens (``guild_daily_tokens``), charged
+    with the usage OpenAI reports for every request.
+    """
+
+    def __init__(self, system_prompt, counter, conversation_memory=None, state_store=None,
+                 prompt_token_budget=DEFAULT_PROMPT_TOKEN_BUDGET, max_tokens=DEFAULT_MAX_TOKENS,
+                 guild_max_tokens=None, guild_daily_tokens=None):
+        self.system_prompt = system_prompt
+        self.counter = counter
+        self.conversation_memory = conversation_memory
+        self.state_store = state_store
+        self.prompt_token_budget = prompt_token_budget
+        self.max_tokens = max_tokens
+        self.guild_max_tokens = {str(guild_id): value for guild_id, value in (guild_max_tokens or {}).items()}
+        self.guild_daily_tokens = guild_daily_tokens
+
+    def tokens_used_today(self, guild_id):
+        if self.state_store is None or guild_id is None:
+            return 0
+        return (self.state_store.guild("prompt_tokens", guild_id)
+                + self.state_store.guild("completion_tokens", guild_id))
+
+    def completion_budget(self, guild_id, prompt_tokens):
+        """``max_tokens`` for a request from this guild, within what's left of its day"""
+        max_tokens = self.guild_max_tokens.get(str(guild_id), self.max_tokens)
+        if not self.guild_daily_tokens or guild_id is None:
+            return max_tokens
+        used = self.tokens_used_today(guild_id)
+        remaining = self.guild_daily_tokens - used - prompt_tokens
+        if remaining < MIN_COMPLETION_TOKENS:
+            raise TokenBudgetExceeded(guild_id, used, self.guild_daily_tokens)
+        return min(max_tokens, remaining)
+
+    def build(self, user_content, channel_id=None, guild_id=None, context=None):
+        """A Prompt for ``user_content``, with as much channel history as fits"""
+        prefix = [{"role": "system", "content": self.system_prompt}]
+        tail = []
+        if context:
+            tail.append({"role": "system", "content": f"Context: {context}"})
+        tail.append({"role": "user", "content": user_content})
+
+        prefix_tokens = self.counter.count_messages(prefix) - REPLY_PRIMING
+        fixed_tokens = prefix_tokens + self.counter.count_messages(tail)
+        if self.conversation_memory is not None and channel_id is not None:
+            history_budget = min(self.conversation_memory.token_budget, self.prompt_token_budget - fixed_tokens)
+            history = self.conversation_memory.build_messages(
+                channel_id, self.system_prompt, user_content,
+                token_budget=max(history_budget, 0),
+                count_tokens=self._count_turn
+            )[1:-1]
+        else:
+            history = []
+
+        messages = prefix + history + tail
+        prompt_tokens = self.counter.count_messages(messages)
+        return Prompt(messages, prompt_tokens, self.completion_budget(guild_id, prompt_tokens), prefix_tokens)
+
+    def _count_turn(self, text):
+        return self.counter.count(text) + MESSAGE_OVERHEAD
+
+    def record_usage(self, prompt, guild_id=None, user_id=None, usage=None, reply_text=""):
+        """Charge a finished request to its guild and user, preferring the billed numbers"""
+        prompt_tokens = getattr(usage, "prompt_tokens", None) or prompt.prompt_tokens
+        completion_tokens = getattr(usage, "completion_tokens", None) or self.counter.count(reply_text)
+        if usage is not None:
+            logger.info(f"Tokens: {prompt_tokens} prompt ({prompt.prompt_tokens} counted locally), "
+                        f"{completion_tokens} completion")
+        if self.state_store is not None:
+            self.state_store.incr("prompt_tokens", guild_id=guild_id, user_id=user_id, amount=prompt_tokens)
+            self.state_store.incr("completion_tokens", guild_id=guild_id, user_id=user_id, amount=completion_tokens)
+        return prompt_tokens + completion_tokens
+
+
+def create_prompt_builder(system_prompt, settings=None, conversation_memory=None, state_store=None):
+    """Build a PromptBuilder from the bot_settings dict"""
+    settings = settings or {}
+    return PromptBuilder(
+        system_prompt,
+        TokenCounter(settings.get("default_model", "gpt-4")),
+        conversation_memory=conversation_memory,
+        state_store=state_store,
+        prompt_token_budget=settings.get("prompt_token_budget", DEFAULT_PROMPT_TOKEN_BUDGET),
+        max_tokens=settings.get("max_tokens", DEFAULT_MAX_TOKENS),
+        guild_max_tokens=settings.get("guild_max_tokens"),
+        guild_daily_tokens=settings.get("guild_daily_tokens")
+    )
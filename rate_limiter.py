@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+from discord.ext import commands
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+
+# Bucket capacity and the number of seconds it takes to refill completely
+DEFAULT_RATE_LIMITS = {
+    "user": {"capacity": 5, "per": 60},
+    "channel": {"capacity": 20, "per": 60},
+    "guild": {"capacity": 60, "per": 60}
+}
+DEFAULT_LIMITED_COMMANDS = ["monday"]
+DEFAULT_MAX_BUCKETS = 10000
+
+# =============================================================================
+# ERRORS
+# =============================================================================
+
+class RateLimited(commands.CommandError):
+    """Raised before a command runs when one of its buckets is empty"""
+
+    def __init__(self, scope, retry_after):
+        self.scope = scope
+        self.retry_after = retry_after
+        super().__init__(f"{scope} rate limit hit, retry in {retry_after:.1f}s")
+
+# =============================================================================
+# TOKEN BUCKETS
+# =============================================================================
+
+class TokenBucket:
+    """Classic token bucket: ``capacity`` tokens, refilled continuously"""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, capacity, per):
+        self.capacity = capacity
+        self.rate = capacity / per
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def retry_after(self):
+        """Seconds until one token is available (0 if one is available now)"""
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """Per-user, per-channel and per-guild token buckets for selected commands.
+
+    A request must find a token in every bucket that applies to it, and
+    only takes them once all of them have one, so a guild-wide limit never
+    eats into a user's allowance. Idle buckets are dropped least recently
+    used first once a scope holds more than ``max_buckets``.
+    """
+
+    def __init__(self, limits=None, limited_commands=None, max_buckets=DEFAULT_MAX_BUCKETS):
+        self.limits = limits or DEFAULT_RATE_LIMITS
+        self.limited_commands = set(limited_commands or DEFAULT_LIMITED_COMMANDS)
+        self.max_buckets = max_buckets
+        self.buckets = {scope: OrderedDict() for scope in self.limits}
+        self.allowed = 0
+        self.throttled = {scope: 0 for scope in self.limits}
+
+    def _bucket(self, scope, key):
+        buckets = self.buckets[scope]
+        bucket = buckets.get(key)
+        if bucket is None:
+            limit = self.limits[scope]
+            bucket = buckets[key] = TokenBucket(limit["capacity"], limit["per"])
+            if len(buckets) > self.max_buckets:
+                buckets.popitem(last=False)
+        else:
+            buckets.move_to_end(key)
+        return bucket
+
+    def acquire(self, user_id, channel_id=None, guild_id=None):
+        """Take one token from every applicable bucket or raise RateLimited"""
+        now = time.monotonic()
+        keys = {"user": user_id, "channel": channel_id, "guild": guild_id}
+        buckets = []
+        for scope in self.limits:
+            if keys.get(scope) is None:
+                continue
+            bucket = self._bucket(scope, keys[scope])
+            bucket.refill(now)
+            if bucket.tokens < 1:
+                self.throttled[scope] += 1
+                raise RateLimited(scope, bucket.retry_after())
+            buckets.append(bucket)
+
+        for bucket in buckets:
+            bucket.tokens -= 1
+        self.allowed += 1
+
+    async def before_invoke(self, ctx):
+        """Bot-wide before_invoke hook that enforces the limits"""
+        if ctx.command is None or ctx.command.name not in self.limited_commands:
+            return
+        self.acquire(
+            ctx.author.id,
+            channel_id=ctx.channel.id if ctx.channel else None,
+            guild_id=ctx.guild.id if ctx.guild else None
+        )
+
+    def stats(self):
+        return {
+            "allowed": self.allowed,
+            "throttled": dict(self.throttled),
+            "buckets": {scope: len(buckets) for scope, buckets in self.buckets.items()}
+        }
+
+    def status_line(self):
+        """One line summary for !status"""
+        throttled = sum(self.throttled.values())
+        tracked = sum(len(buckets) for buckets in self.buckets.values())
+        return f"Requests allowed: {self.allowed}, throttled: {throttled}, buckets tracked: {tracked}"
+
+# =============================================================================
+# REQUEST COALESCING
+# =============================================================================
+
+class SingleFlight:
+    """Let concurrent identical requests share one in-flight call"""
+
+    def __init__(self):
+        self._calls = {}
+        self.coalesced = 0
+
+    async def do(self, key, func):
+        """Await ``func()`` once per key; returns (result, shared).
+
+        ``shared`` is True for callers that joined somebody else's call
+        rather than making it themselves.
+        """
+        future = self._calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting on the future, so don't warn about unread errors
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._calls[key] = future
+        try:
+            result = await func()
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        except BaseException:
+            future.set_exception(RuntimeError("Coalesced request was cancelled"))
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._calls[key]
+
+
+def create_rate_limiter(settings=None):
+    """Build a RateLimiter from the bot_settings dict"""
+    settings = settings or {}
+    return RateLimiter(
+        limits=settings.get("rate_limits"),
+        limited_commands=settings.get("rate_limited_commands"),
+        max_buckets=settings.get("rate_limit_max_buckets", DEFAULT_MAX_BUCKETS)
+    )
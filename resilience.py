@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import random
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 8.0
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RECOVERY_TIME = 30.0
+
+# Why a failed request is worth retrying; None means it isn't
+RATE_LIMITED = "rate_limited"
+SERVER_ERROR = "server_error"
+TIMEOUT = "timeout"
+CONNECTION = "connection"
+OUTAGE_REASONS = (SERVER_ERROR, TIMEOUT, CONNECTION)
+
+DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+# =============================================================================
+# ERROR CLASSIFICATION
+# =============================================================================
+
+def classify_error(error):
+    """The retry reason for an OpenAI or network error, or None if retrying won't help"""
+    if isinstance(error, RateLimitPaused):
+        return RATE_LIMITED
+    if isinstance(error, asyncio.TimeoutError):
+        return TIMEOUT
+    status = getattr(error, "status_code", None)
+    if status is None:
+        # openai.APIConnectionError and APITimeoutError carry no status
+        name = type(error).__name__
+        if name == "APITimeoutError":
+            return TIMEOUT
+        if name == "APIConnectionError":
+            return CONNECTION
+        return None
+    if status == 429:
+        # An exhausted quota is also a 429, but waiting won't fix it
+        return None if getattr(error, "code", None) == "insufficient_quota" else RATE_LIMITED
+    if status in (408, 409) or status >= 500:
+        return SERVER_ERROR
+    return None
+
+
+def error_headers(error):
+    response = getattr(error, "response", None)
+    return getattr(response, "headers", None) or {}
+
+
+def parse_duration(value):
+    """Seconds in an OpenAI reset header ("1s", "6m0s", "20ms"), or None"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def parse_retry_after(headers):
+    """Seconds from ``retry-after-ms`` or ``retry-after``, or None"""
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    if headers.get("retry-after"):
+        try:
+            return float(headers["retry-after"])
+        except ValueError:
+            # An HTTP date; not worth parsing for how rarely OpenAI sends one
+            return None
+    return None
+
+# =============================================================================
+# RETRY POLICY
+# =============================================================================
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, bounded by attempts and a deadline"""
+
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, base_delay=DEFAULT_BASE_DELAY,
+                 max_delay=DEFAULT_MAX_DELAY):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt, retry_after=None):
+        """Seconds to wait before retry number ``attempt + 1``"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            # The server knows best, but jitter keeps retries from arriving in lockstep
+            delay = retry_after + delay / 2
+        return delay
+
+    def should_retry(self, attempt, reason, delay, deadline):
+        return (
+            reason is not None
+            and attempt + 1 < self.max_attempts
+            and time.monotonic() + delay < deadline
+        )
+
+# =============================================================================
+# RATE LIMIT PACING
+# =============================================================================
+
+class RateLimitPaused(Exception):
+    """Raised when a rate limit pause would outlast the request's deadline"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"OpenAI rate limited for another {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class RateLimitPacer:
+    """Holds every outgoing request while OpenAI says we're over a limit.
+
+    Fed the headers of every response and error: a 429's ``retry-after``,
+    or ``x-ratelimit-remaining-*`` reaching zero, pauses all callers until
+    the matching reset instead of letting each in-flight request discover
+    the limit by failing.
+    """
+
+    def __init__(self):
+        self.paused_until = 0.0
+        self.pauses = 0
+
+    def update(self, headers, status=None):
+        if not headers:
+            return
+        pause = 0.0
+        if status == 429:
+            pause = parse_retry_after(headers) or 0.0
+        for kind in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if remaining is not None and remaining.isdigit() and int(remaining) == 0:
+                pause = max(pause, parse_duration(headers.get(f"x-ratelimit-reset-{kind}")) or 0.0)
+        if pause <= 0:
+            return
+        until = time.monotonic() + pause
+        if until > self.paused_until:
+            self.paused_until = until
+            self.pauses += 1
+            logger.warning(f"OpenAI rate limit reached, pausing requests for {pause:.1f}s")
+
+    def delay(self):
+        return max(0.0, self.paused_until - time.monotonic())
+
+    async def wait(self, deadline=None):
+        """Sleep out any pause, or raise RateLimitPaused now if it outlasts ``deadline``"""
+        delay = self.delay()
+        if delay <= 0:
+            return
+        if deadline is not None and time.monotonic() + delay > deadline:
+            raise RateLimitPaused(delay)
+        await asyncio.sleep(delay)
+
+# =============================================================================
+# CIRCUIT BREAKER
+# =============================================================================
+
+class CircuitOpen(Exception):
+    """Raised instead of calling OpenAI while the circuit breaker is open"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"OpenAI circuit open, retrying in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Stops calling OpenAI for a while after repeated outage failures.
+
+    ``failure_threshold`` consecutive server errors, timeouts or connection
+    failures open the circuit: for ``recovery_time`` seconds every request
+    fails fast with CircuitOpen. After that a single trial request is let
+    through; success closes the circuit, failure opens it again. Rate
+    limiting and bad requests don't count, since the API is up.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, recovery_time=DEFAULT_RECOVERY_TIME):
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._trial = False
+
+    def allow(self):
+        """Raise CircuitOpen unless a request may go out now"""
+        if self.state == self.OPEN:
+            remaining = self.opened_at + self.recovery_time - time.monotonic()
+            if remaining > 0:
+                raise CircuitOpen(remaining)
+            self.state = self.HALF_OPEN
+            self._trial = False
+        if self.state == self.HALF_OPEN:
+            if self._trial:
+                raise CircuitOpen(self.recovery_time)
+            self._trial = True
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info("OpenAI is answering again, closing the circuit")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial = False
+
+    def record_failure(self, reason):
+        """Count a failed request; only outages move the breaker towards open"""
+        if reason not in OUTAGE_REASONS:
+            self.release()
+            return
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+                logger.error(f"OpenAI failing ({self.failures} in a row), opening the circuit for {self.recovery_time:.0f}s")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._trial = False
+
+    def release(self):
+        """A request ended without telling us anything (cancelled, bad request...)"""
+        self._trial = False
+
+    def stats(self):
+        return {
+            "open": int(self.state != self.CLOSED),
+            "consecutive_failures": self.failures,
+            "trips": self.trips
+        }
@@ -0,0 +1,344 @@
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 1024 * 1024
+DEFAULT_TTL = 3600
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+# Placeholder stored in place of the asker's name, so one cached reply fits everyone
+USER_PLACEHOLDER = "{user}"
+
+# Names too short or too ordinary to tell apart from the rest of a reply
+MIN_NAME_LENGTH = 3
+COMMON_WORDS = frozenset({
+    "all", "and", "any", "are", "ask", "bad", "bot", "but", "can", "day", "did", "far", "few", "for",
+    "fun", "get", "god", "good", "got", "had", "has", "her", "here", "him", "his", "hot", "how", "joy",
+    "just", "let", "like", "man", "may", "more", "new", "nice", "nobody", "not", "now", "off", "old",
+    "one", "our", "out", "own", "rose", "say", "see", "she", "someone", "sun", "that", "the", "them",
+    "then", "they", "this", "too", "two", "use", "user", "was", "way", "well", "what", "who", "why",
+    "will", "with", "yes", "yet", "you", "your",
+})
+
+CONTRACTIONS = {
+    "what's": "what is",
+    "whats": "what is",
+    "how's": "how is",
+    "it's": "it is",
+    "i'm": "i am",
+    "you're": "you are",
+    "sup": "what is up",
+    "wassup": "what is up",
+    "u": "you",
+    "r": "are",
+    "pls": "please",
+    "plz": "please",
+}
+
+# Letters only: "1000" and "10" are different questions
+_REPEATED_CHARS = re.compile(r"([^\W\d_])\1{2,}")
+_TRAILING_PUNCTUATION = re.compile(r"[\s.,;:!?\u2026~]+$")
+_WHITESPACE = re.compile(r"\s+")
+
+# =============================================================================
+# KEYS
+# =============================================================================
+
+def normalize_prompt(text):
+    """Fold cosmetic differences so "Hiii!!" and "hi" share a cache entry.
+
+    Only case, whitespace, stretched letters and trailing punctuation are
+    folded; symbols inside the text are kept, since "2+2" and "2*2" or
+    "C++" and "C#" are different questions.
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = _TRAILING_PUNCTUATION.sub("", text)
+    text = _REPEATED_CHARS.sub(r"\1", text)
+    words = [CONTRACTIONS.get(word, word) for word in _WHITESPACE.split(text.strip()) if word]
+    return " ".join(words)
+
+
+def make_cache_key(message, model, settings, system_prompt="", extra=()):
+    """Hash the normalized message with everything that shapes the reply"""
+    payload = json.dumps([
+        normalize_prompt(message),
+        model,
+        settings.get("max_tokens", 300),
+        settings.get("temperature", 0.8),
+        hashlib.sha256(system_prompt.encode()).hexdigest(),
+        list(extra)
+    ])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def make_cache_scope(model, settings, system_prompt="", extra=()):
+    """Hash everything that shapes the reply except the message itself"""
+    payload = json.dumps([
+        model,
+        settings.get("max_tokens", 300),
+        settings.get("temperature", 0.8),
+        hashlib.sha256(system_prompt.encode()).hexdigest(),
+        list(extra)
+    ])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+class WriteBehind:
+    """Queues row changes and applies them from a thread, one transaction per batch.
+
+    ``put(key, row)`` replaces any change still queued for ``key``, so the
+    event loop only ever touches a dict. Every ``interval`` seconds the
+    thread hands what has queued up to ``apply(changes)``; a batch that
+    fails is queued again behind anything newer.
+    """
+
+    def __init__(self, apply, interval=DEFAULT_FLUSH_INTERVAL, name="cache-writer"):
+        self.apply = apply
+        self.interval = interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def put(self, key, row):
+        with self._lock:
+            self._pending[key] = row
+
+    def flush(self):
+        """Apply everything queued (blocking; run off the event loop)"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        try:
+            self.apply(pending)
+        except Exception:
+            with self._lock:
+                for key, row in pending.items():
+                    self._pending.setdefault(key, row)
+            raise
+        return len(pending)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Cache write failed: {e}")
+
+    def close(self):
+        """Stop the thread and apply whatever is left"""
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+
+
+class SQLiteCacheBackend:
+    """On-disk copy of the cache so entries survive restarts.
+
+    Stores and deletes are written behind by a WriteBehind thread, so
+    ``set`` and ``delete`` never wait on disk.
+    """
+
+    def __init__(self, path, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.path = path
+        # Opened wherever the cache is built, written from the writer thread
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, text TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        self._writer = WriteBehind(self._apply, flush_interval, name="response-cache-writer")
+
+    def load(self, limit):
+        """Newest unexpired entries, oldest first, for warming the memory tier"""
+        self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+        self._conn.commit()
+        rows = self._conn.execute(
+            "SELECT key, expires_at, text FROM responses ORDER BY expires_at DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+        return list(reversed(rows))
+
+    def set(self, key, expires_at, text):
+        self._writer.put(key, (expires_at, text))
+
+    def delete(self, key):
+        self._writer.put(key, None)
+
+    def _apply(self, changes):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO responses (key, expires_at, text) VALUES (?, ?, ?)",
+                [(key, *row) for key, row in changes.items() if row is not None]
+            )
+            self._conn.executemany(
+                "DELETE FROM responses WHERE key = ?",
+                [(key,) for key, row in changes.items() if row is None]
+            )
+
+    def close(self):
+        self._writer.close()
+        self._conn.close()
+
+# =============================================================================
+# CACHE
+# =============================================================================
+
+class ResponseCache:
+    """Bounded LRU + TTL cache of completion text.
+
+    Entries are evicted least-recently-used first once either
+    ``max_entries`` or ``max_bytes`` is exceeded, and expire ``ttl``
+    seconds after they were stored. With a backend, the memory tier is
+    warmed from disk at startup and every store is written through, so
+    lookups never touch the disk.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES,
+                 ttl=DEFAULT_TTL, backend=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size_bytes = 0
+        self._entries = OrderedDict()
+
+        if backend:
+            for key, expires_at, text in backend.load(max_entries):
+                self._store(key, expires_at, text)
+            logger.info(f"Response cache warmed with {len(self._entries)} entries from {backend.path}")
+
+    def get(self, key):
+        """Cached text for ``key``, or None"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, text = entry
+        if expires_at <= time.time():
+            self._remove(key)
+            if self.backend:
+                self.backend.delete(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return text
+
+    def set(self, key, text):
+        expires_at = time.time() + self.ttl
+        self._store(key, expires_at, text)
+        if self.backend:
+            self.backend.set(key, expires_at, text)
+
+    def _store(self, key, expires_at, text):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (expires_at, text)
+        self.size_bytes += _entry_size(key, text)
+
+        while self._entries and (len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            if self.backend:
+                self.backend.delete(oldest)
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, text = self._entries.pop(key)
+        self.size_bytes -= _entry_size(key, text)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def close(self):
+        if self.backend:
+            self.backend.close()
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate
+        }
+
+
+def _entry_size(key, text):
+    return len(key) + len(text.encode())
+
+
+def personalize(text, display_name):
+    """Swap a cached reply's placeholder for the current asker's name"""
+    return text.replace(USER_PLACEHOLDER, display_name)
+
+
+def can_depersonalize(display_name):
+    """Whether a name is distinctive enough to swap for a placeholder safely.
+
+    Replies to askers called "I" or "Will" can't be cached: there is no
+    telling their name apart from the same word used in the reply.
+    """
+    return (
+        bool(display_name)
+        and len(display_name) >= MIN_NAME_LENGTH
+        and display_name.lower() not in COMMON_WORDS
+    )
+
+
+def depersonalize(text, display_name):
+    """Swap the asker's name (whole words only) for a placeholder before caching a reply"""
+    if not display_name:
+        return text
+    pattern = rf"(?<!\w){re.escape(display_name)}(?!\w)"
+    return re.sub(pattern, lambda _: USER_PLACEHOLDER, text)
+
+
+def create_response_cache(settings=None):
+    """Build a ResponseCache from the bot_settings dict, or None if disabled"""
+    settings = settings or {}
+    if not settings.get("cache_enabled", True):
+        return None
+
+    backend = None
+    if settings.get("cache_path"):
+        backend = SQLiteCacheBackend(
+            settings["cache_path"], settings.get("cache_flush_interval", DEFAULT_FLUSH_INTERVAL)
+        )
+
+    return ResponseCache(
+        max_entries=settings.get("cache_max_entries", DEFAULT_MAX_ENTRIES),
+        max_bytes=settings.get("cache_max_bytes", DEFAULT_MAX_BYTES),
+        ttl=settings.get("cache_ttl", DEFAULT_TTL),
+        backend=backend
+    )
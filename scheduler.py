@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+
+PRIORITY_HIGH = 0    # DMs and server admins
+PRIORITY_NORMAL = 1  # short prompts
+PRIORITY_LOW = 2     # long prompts
+PRIORITY_NAMES = {PRIORITY_HIGH: "high", PRIORITY_NORMAL: "normal", PRIORITY_LOW: "low"}
+
+DEFAULT_WORKERS = 8
+DEFAULT_MAX_QUEUE = 100
+DEFAULT_MAX_PER_GUILD = 20
+DEFAULT_SHORT_PROMPT_CHARS = 200
+WAIT_SAMPLES = 200
+
+# =============================================================================
+# ERRORS
+# =============================================================================
+
+class QueueFull(Exception):
+    """Raised immediately when a request can't be queued"""
+
+# =============================================================================
+# SCHEDULER
+# =============================================================================
+
+def classify(ctx, message, short_prompt_chars=DEFAULT_SHORT_PROMPT_CHARS):
+    """Priority class for a command invocation"""
+    if ctx.guild is None:
+        return PRIORITY_HIGH
+    permissions = getattr(ctx.author, "guild_permissions", None)
+    if permissions is not None and permissions.administrator:
+        return PRIORITY_HIGH
+    if len(message) <= short_prompt_chars:
+        return PRIORITY_NORMAL
+    return PRIORITY_LOW
+
+
+class Job:
+    __slots__ = ("func", "future", "enqueued_at", "guild_id")
+
+    def __init__(self, func, future, guild_id):
+        self.func = func
+        self.future = future
+        self.enqueued_at = time.monotonic()
+        self.guild_id = guild_id
+
+
+class RequestScheduler:
+    """Bounded priority queue in front of a fixed pool of workers.
+
+    Higher priority classes are always served first. Within a class,
+    guilds take turns, so one busy server can't starve the rest. When the
+    queue (or a single guild's share of it) is full, ``submit`` raises
+    QueueFull straight away instead of letting the request time out.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_queue=DEFAULT_MAX_QUEUE,
+                 max_per_guild=DEFAULT_MAX_PER_GUILD):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_per_guild = max_per_guild
+        self.depth = 0
+        self.max_depth_seen = 0
+        self.active = 0
+        self.processed = 0
+        self.rejected = 0
+        self.waits = deque(maxlen=WAIT_SAMPLES)
+        # priority -> OrderedDict of guild_id -> deque of jobs, rotated for fairness
+        self._queues = {priority: OrderedDict() for priority in PRIORITY_NAMES}
+        self._guild_depth = {}
+        self._ready = None
+        self._tasks = []
+
+    def _ensure_started(self):
+        if self._tasks:
+            return
+        self._ready = asyncio.Condition()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Request scheduler started with {self.workers} workers")
+
+    async def submit(self, func, guild_id=None, priority=PRIORITY_NORMAL):
+        """Queue ``func`` (an async callable) and return its result once a worker runs it"""
+        self._ensure_started()
+        if self.depth >= self.max_queue:
+            self.rejected += 1
+            raise QueueFull(f"queue full ({self.depth} waiting)")
+        if self._guild_depth.get(guild_id, 0) >= self.max_per_guild:
+            self.rejected += 1
+            raise QueueFull(f"guild {guild_id} already has {self.max_per_guild} requests waiting")
+
+        future = asyncio.get_running_loop().create_future()
+        job = Job(func, future, guild_id)
+        guilds = self._queues[priority]
+        if guild_id not in guilds:
+            guilds[guild_id] = deque()
+        guilds[guild_id].append(job)
+        self._guild_depth[guild_id] = self._guild_depth.get(guild_id, 0) + 1
+        self.depth += 1
+        self.max_depth_seen = max(self.max_depth_seen, self.depth)
+
+        async with self._ready:
+            self._ready.notify()
+        return await future
+
+    def _next_job(self):
+        for priority in PRIORITY_NAMES:
+            guilds = self._queues[priority]
+            while guilds:
+                guild_id, jobs = guilds.popitem(last=False)
+                job = jobs.popleft()
+                if jobs:
+                    # Back of the line for this guild
+                    guilds[guild_id] = jobs
+                self.depth -= 1
+                remaining = self._guild_depth[guild_id] - 1
+                if remaining:
+                    self._guild_depth[guild_id] = remaining
+                else:
+                    del self._guild_depth[guild_id]
+                if job.future.cancelled():
+                    continue
+                return job
+        return None
+
+    async def _worker(self, number):
+        while True:
+            async with self._ready:
+                await self._ready.wait_for(lambda: self.depth > 0)
+                job = self._next_job()
+            if job is None:
+                continue
+
+            self.waits.append(time.monotonic() - job.enqueued_at)
+            self.active += 1
+            try:
+                result = await job.func()
+            except asyncio.CancelledError:
+                job.future.cancel()
+                # Stop if this worker is being cancelled; a job that cancelled itself is just done
+                if asyncio.current_task().cancelling():
+                    raise
+            except Exception as e:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                self.active -= 1
+                self.processed += 1
+
+    def wait_percentile(self, pct):
+        if not self.waits:
+            return 0.0
+        ordered = sorted(self.waits)
+        return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+    def stats(self):
+        return {
+            "depth": self.depth,
+            "max_depth_seen": self.max_depth_seen,
+            "active": self.active,
+            "processed": self.processed,
+            "rejected": self.rejected,
+            "wait_p50": self.wait_percentile(50),
+            "wait_p95": self.wait_percentile(95)
+        }
+
+    def status_line(self):
+        """One line summary for !status"""
+        return (f"Queue: {self.depth} waiting, {self.active} running, {self.rejected} turned away, "
+                f"p95 wait {self.wait_percentile(95):.1f}s")
+
+
+def create_scheduler(settings=None):
+    """Build a RequestScheduler from the bot_settings dict"""
+    settings = settings or {}
+    return RequestScheduler(
+        workers=settings.get("scheduler_workers", settings.get("max_concurrent_requests", DEFAULT_WORKERS)),
+        max_queue=settings.get("scheduler_max_queue", DEFAULT_MAX_QUEUE),
+        max_per_guild=settings.get("scheduler_max_per_guild", DEFAULT_MAX_PER_GUILD)
+    )
@@ -0,0 +1,318 @@
+import logging
+import os
+import re
+import sqlite3
+import time
+import zlib
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from response_cache import DEFAULT_FLUSH_INTERVAL, WriteBehind, normalize_prompt
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_DIMENSIONS = 512
+DEFAULT_THRESHOLD = 0.9
+DEFAULT_TTL = 3600
+
+# Character trigrams catch typos and plurals, but count less than whole words;
+# pairs of neighbouring tokens keep word order, so they count more
+TRIGRAM_WEIGHT = 0.5
+BIGRAM_WEIGHT = 1.5
+
+# Words that change how a question is phrased more than what it asks
+STOPWORDS = frozenset({
+    "a", "an", "the", "to", "of", "in", "on", "for", "with", "and", "or",
+    "i", "me", "my", "you", "your", "it", "is", "are", "am", "be",
+    "do", "does", "can", "could", "would", "should", "how", "what",
+    "please", "hey", "monday", "just", "so",
+})
+
+# Words, and every symbol on its own: "2+2" is "2", "+", "2"
+_TOKENS = re.compile(r"\w+|[^\w\s]")
+
+
+def content_tokens(text):
+    """The normalized tokens of ``text`` that say what it asks, in order"""
+    tokens = _TOKENS.findall(normalize_prompt(text))
+    return [token for token in tokens if token not in STOPWORDS] or tokens
+
+
+def token_set_id(text):
+    """A number identifying the set of content tokens in ``text``"""
+    return zlib.crc32(" ".join(sorted(set(content_tokens(text)))).encode())
+
+# =============================================================================
+# EMBEDDING
+# =============================================================================
+
+class HashingEmbedder:
+    """Local stand-in for an embedding model, so the cache works offline.
+
+    Tokens (words and symbols), the character trigrams of words and pairs
+    of neighbouring tokens are hashed into ``dimensions`` buckets with a
+    random sign (the hashing trick), and the vector is normalized, so the
+    dot product of two embeddings is their cosine similarity. The pairs
+    keep word order and operators apart: "convert celsius to fahrenheit"
+    doesn't match "convert fahrenheit to celsius", nor "2+2" "2*2". It
+    only knows about shared words, not meaning: "how do I center a div"
+    matches "how to center div" but not "align a box in the middle".
+    Anything with the same ``dimensions`` and ``embed(text)`` can replace
+    it.
+    """
+
+    def __init__(self, dimensions=DEFAULT_DIMENSIONS):
+        self.dimensions = dimensions
+
+    def features(self, text):
+        tokens = content_tokens(text)
+        for token in tokens:
+            yield token, 1.0
+            if token[0].isalpha():
+                padded = f"<{token}>"
+                for i in range(len(padded) - 2):
+                    yield padded[i:i + 3], TRIGRAM_WEIGHT
+        for first, second in zip(tokens, tokens[1:]):
+            yield f"{first} {second}", BIGRAM_WEIGHT
+
+    def embed(self, text):
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature, weight in self.features(text):
+            # crc32 rather than hash(), which changes between runs and would spoil the saved index
+            digest = zlib.crc32(feature.encode())
+            vector[digest % self.dimensions] += weight if digest & 0x80000000 else -weight
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+# =============================================================================
+# PERSISTENCE
+# =============================================================================
+
+class SemanticIndexStore:
+    """Vectors in a memory-mapped .npy file, prompts and replies in SQLite.
+
+    Startup maps the vector file instead of reading or re-embedding
+    anything, and row ``slot`` of the file belongs to the entry with the
+    same slot in the database. Database rows are written behind by a
+    WriteBehind thread, so storing a reply never waits on a commit.
+    """
+
+    def __init__(self, path, max_entries, dimensions, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.path = path
+        vectors_path = f"{path}.npy"
+        shape = (max_entries, dimensions)
+        self.vectors = None
+        if os.path.exists(vectors_path):
+            try:
+                self.vectors = np.lib.format.open_memmap(vectors_path, mode="r+")
+            except ValueError as e:
+                logger.warning(f"Could not map {vectors_path}: {e}")
+            if self.vectors is not None and (self.vectors.shape != shape or self.vectors.dtype != np.float32):
+                logger.warning(f"Semantic index at {vectors_path} has shape {self.vectors.shape}, rebuilding as {shape}")
+                self.vectors = None
+        fresh = self.vectors is None
+        if fresh:
+            self.vectors = np.lib.format.open_memmap(vectors_path, mode="w+", dtype=np.float32, shape=shape)
+
+        # Built off the event loop by Services.warm, used on it afterwards
+        self._conn = sqlite3.connect(f"{path}.db", check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "slot INTEGER PRIMARY KEY, scope INTEGER NOT NULL, expires_at REAL NOT NULL, "
+            "prompt TEXT NOT NULL, reply TEXT NOT NULL)"
+        )
+        if fresh:
+            self._conn.execute("DELETE FROM entries")
+        self._conn.commit()
+        self._writer = WriteBehind(self._apply, flush_interval, name="semantic-cache-writer")
+
+    def load(self):
+        """Unexpired entries as (slot, scope, expires_at, prompt, reply) rows"""
+        self._conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+        self._conn.commit()
+        return self._conn.execute(
+            "SELECT slot, scope, expires_at, prompt, reply FROM entries WHERE slot < ?", (len(self.vectors),)
+        ).fetchall()
+
+    def set(self, slot, scope, expires_at, prompt, reply):
+        self._writer.put(slot, (scope, expires_at, prompt, reply))
+
+    def _apply(self, changes):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO entries (slot, scope, expires_at, prompt, reply) VALUES (?, ?, ?, ?, ?)",
+                [(slot, *row) for slot, row in changes.items()]
+            )
+
+    def close(self):
+        self._writer.close()
+        self.vectors.flush()
+        self._conn.close()
+
+# =============================================================================
+# CACHE
+# =============================================================================
+
+def scope_id(scope):
+    """A cache scope hash (see make_cache_scope) as a number numpy can compare"""
+    return int(scope[:15], 16)
+
+
+class SemanticCache:
+    """Reuses replies to earlier messages that mean nearly the same thing.
+
+    Every stored reply keeps the embedding of the message that produced
+    it. A lookup embeds the new message and takes the nearest stored one
+    with a single matrix-vector product; its reply is reused if the cosine
+    similarity is at least ``threshold``. Only entries from the same scope
+    (model, settings, system prompt and mood) whose message has exactly the
+    same content words (everything but stopwords) are considered, so the
+    similarity only has to judge order and phrasing: a long question never
+    matches one that adds a "not" or swaps "react" for "vue", however
+    close their vectors are.
+
+    There are ``max_entries`` fixed slots. Expired slots are reused first,
+    then the least recently used one is evicted. With a store, vectors
+    live in a memory-mapped file and survive restarts.
+    """
+
+    def __init__(self, embedder, max_entries=DEFAULT_MAX_ENTRIES, threshold=DEFAULT_THRESHOLD,
+                 ttl=DEFAULT_TTL, store=None):
+        self.embedder = embedder
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl = ttl
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.last_similarity = 0.0
+
+        if store is not None:
+            self.vectors = store.vectors
+        else:
+            self.vectors = np.zeros((max_entries, embedder.dimensions), dtype=np.float32)
+        self._scopes = np.zeros(max_entries, dtype=np.int64)
+        self._token_sets = np.zeros(max_entries, dtype=np.int64)
+        self._expires = np.zeros(max_entries, dtype=np.float64)    # 0 marks an empty slot
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._replies = [None] * max_entries
+        # Slots are filled in order, so searches stop at the highest one used
+        self._size = 0
+
+        if store is not None:
+            rows = store.load()
+            for slot, scope, expires_at, prompt, reply in rows:
+                self._scopes[slot] = scope
+                self._token_sets[slot] = token_set_id(prompt)
+                self._expires[slot] = expires_at
+                self._last_used[slot] = expires_at - ttl
+                self._replies[slot] = reply
+                self._size = max(self._size, slot + 1)
+            logger.info(f"Semantic cache loaded {len(rows)} entries from {store.path}")
+
+    def live_entries(self):
+        return int(np.count_nonzero(self._expires[:self._size] > time.time()))
+
+    def get(self, message, scope):
+        """A stored reply to a message like ``message`` in ``scope``, or None"""
+        if self._size == 0:
+            self.misses += 1
+            return None
+        size = self._size
+        similarities = self.vectors[:size] @ self.embedder.embed(message)
+        live = (
+            (self._scopes[:size] == scope_id(scope))
+            & (self._token_sets[:size] == token_set_id(message))
+            & (self._expires[:size] > time.time())
+        )
+        similarities = np.where(live, similarities, -1.0)
+        slot = int(np.argmax(similarities))
+        self.last_similarity = float(similarities[slot])
+        if self.last_similarity < self.threshold:
+            self.misses += 1
+            return None
+        self._last_used[slot] = time.time()
+        self.hits += 1
+        return self._replies[slot]
+
+    def set(self, message, scope, reply):
+        now = time.time()
+        slot = self._free_slot(now)
+        self.vectors[slot] = self.embedder.embed(message)
+        self._scopes[slot] = scope_id(scope)
+        self._token_sets[slot] = token_set_id(message)
+        self._expires[slot] = now + self.ttl
+        self._last_used[slot] = now
+        self._replies[slot] = reply
+        if self.store is not None:
+            self.store.set(slot, int(self._scopes[slot]), now + self.ttl, message, reply)
+
+    def _free_slot(self, now):
+        if self._size < self.max_entries:
+            self._size += 1
+            return self._size - 1
+        slot = int(np.argmin(self._expires))
+        if self._expires[slot] > now:
+            slot = int(np.argmin(self._last_used))
+            self.evictions += 1
+        return slot
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {
+            "entries": self.live_entries(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+            "last_similarity": self.last_similarity
+        }
+
+    def close(self):
+        if self.store is not None:
+            self.store.close()
+
+
+def create_semantic_cache(settings=None):
+    """Build a SemanticCache from the bot_settings dict, or None if disabled"""
+    settings = settings or {}
+    if not settings.get("cache_enabled", True) or not settings.get("semantic_cache_enabled", True):
+        return None
+    if np is None:
+        logger.info("numpy not installed, semantic cache disabled")
+        return None
+
+    max_entries = settings.get("semantic_cache_max_entries", DEFAULT_MAX_ENTRIES)
+    embedder = HashingEmbedder(settings.get("semantic_cache_dimensions", DEFAULT_DIMENSIONS))
+    store = None
+    path = settings.get("semantic_cache_path")
+    if path:
+        if os.getenv("WORKER_ID"):
+            # Sharded workers (sharding.py) each hand out slots on their own, so each keeps its own index
+            path = f"{path}.worker{os.getenv('WORKER_ID')}"
+        store = SemanticIndexStore(
+            path, max_entries, embedder.dimensions, settings.get("cache_flush_interval", DEFAULT_FLUSH_INTERVAL)
+        )
+
+    return SemanticCache(
+        embedder,
+        max_entries=max_entries,
+        threshold=settings.get("semantic_cache_threshold", DEFAULT_THRESHOLD),
+        ttl=settings.get("cache_ttl", DEFAULT_TTL),
+        store=store
+    )
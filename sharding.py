@@ -0,0 +1,204 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+from discord.ext import commands
+
+from log_pipeline import setup_logging
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+
+DEFAULT_REPORT_INTERVAL = 5.0
+RESTART_DELAY = 5.0
+MAX_RESTART_DELAY = 60.0
+GATEWAY_BOT_URL = "https://discord.com/api/v10/gateway/bot"
+
+# =============================================================================
+# WORKER SIDE
+# =============================================================================
+
+def shard_config():
+    """(shard_count, shard_ids) for this process from SHARD_COUNT / SHARD_IDS"""
+    shard_count = os.getenv("SHARD_COUNT")
+    shard_ids = os.getenv("SHARD_IDS")
+    return (
+        int(shard_count) if shard_count else None,
+        [int(shard_id) for shard_id in shard_ids.split(",")] if shard_ids else None
+    )
+
+
+def worker_id():
+    return os.getenv("WORKER_ID", "0")
+
+
+def create_bot(intents, command_prefix='!'):
+    """A plain Bot, or an AutoShardedBot when SHARD_COUNT or AUTO_SHARD is set.
+
+    With AUTO_SHARD alone, Discord picks the shard count and this process
+    runs all of them; the launcher below sets SHARD_COUNT and SHARD_IDS to
+    split them across processes.
+    """
+    shard_count, shard_ids = shard_config()
+    if shard_count is None and not os.getenv("AUTO_SHARD"):
+        return commands.Bot(command_prefix=command_prefix, intents=intents)
+
+    logger.info(f"Worker {worker_id()} running shards {shard_ids or 'all'} of {shard_count or 'auto'}")
+    return commands.AutoShardedBot(
+        command_prefix=command_prefix,
+        intents=intents,
+        shard_count=shard_count,
+        shard_ids=shard_ids
+    )
+
+
+async def report_worker_stats(state_store, bot, interval=DEFAULT_REPORT_INTERVAL, **components):
+    """Publish this worker's in-memory numbers so any worker's !status can sum them.
+
+    ``components`` are objects with a ``stats()`` dict; their numeric
+    values are published as ``<name>_<stat>``.
+    """
+    while True:
+        stats = {"guilds": len(bot.guilds)}
+        for name, component in components.items():
+            if component is None:
+                continue
+            for stat, value in component.stats().items():
+                if isinstance(value, (int, float)):
+                    stats[f"{name}_{stat}"] = value
+        state_store.publish_worker(worker_id(), stats)
+        await asyncio.sleep(interval)
+
+
+_report_task = None
+
+
+def start_worker_reporting(state_store, bot, **components):
+    """Start report_worker_stats once (on_ready fires again after reconnects)"""
+    global _report_task
+    if _report_task is None or _report_task.done():
+        _report_task = asyncio.create_task(
+            report_worker_stats(state_store, bot, state_store.flush_interval, **components)
+        )
+
+# =============================================================================
+# LAUNCHER
+# =============================================================================
+
+def recommended_shard_count(token):
+    """Ask Discord how many shards this bot should run"""
+    request = urllib.request.Request(GATEWAY_BOT_URL, headers={"Authorization": f"Bot {token}"})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.load(response)["shards"]
+
+
+def split_shards(shard_count, processes):
+    """Contiguous shard ranges, one per process"""
+    processes = min(processes, shard_count)
+    base, extra = divmod(shard_count, processes)
+    ranges = []
+    start = 0
+    for index in range(processes):
+        size = base + (1 if index < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+
+class Launcher:
+    """Runs one bot process per shard range and restarts any that crash.
+
+    All workers share the same state database, which is how counters and
+    per-worker stats are pooled for !status.
+    """
+
+    def __init__(self, script, shard_ranges, shard_count):
+        self.script = script
+        self.shard_ranges = shard_ranges
+        self.shard_count = shard_count
+        self.processes = {}
+        self.started_at = {}
+        self.restart_at = {}
+        self.restart_delays = {}
+        self.stopping = False
+
+    def spawn(self, index):
+        env = dict(
+            os.environ,
+            WORKER_ID=str(index),
+            SHARD_COUNT=str(self.shard_count),
+            SHARD_IDS=",".join(str(shard_id) for shard_id in self.shard_ranges[index])
+        )
+        # Each worker serves metrics on its own port: METRICS_PORT + worker index
+        if index and env.get("METRICS_PORT"):
+            env["METRICS_PORT"] = str(int(env["METRICS_PORT"]) + index)
+        self.processes[index] = subprocess.Popen([sys.executable, self.script], env=env)
+        self.started_at[index] = time.monotonic()
+        logger.info(f"Started worker {index} (pid {self.processes[index].pid}) for shards {self.shard_ranges[index]}")
+
+    def stop(self, *_):
+        self.stopping = True
+        for process in self.processes.values():
+            if process.poll() is None:
+                process.terminate()
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for index in range(len(self.shard_ranges)):
+            self.spawn(index)
+
+        while not self.stopping:
+            time.sleep(1)
+            now = time.monotonic()
+            for index, process in list(self.processes.items()):
+                if self.stopping:
+                    break
+                if index in self.restart_at:
+                    if now >= self.restart_at[index]:
+                        del self.restart_at[index]
+                        self.spawn(index)
+                    continue
+
+                code = process.poll()
+                if code is None:
+                    continue
+                # Back off on crash loops, but start over after a healthy run
+                if now - self.started_at[index] > MAX_RESTART_DELAY:
+                    self.restart_delays[index] = RESTART_DELAY
+                delay = self.restart_delays.get(index, RESTART_DELAY)
+                self.restart_delays[index] = min(delay * 2, MAX_RESTART_DELAY)
+                self.restart_at[index] = now + delay
+                logger.warning(f"Worker {index} exited with {code}, restarting in {delay:.0f}s")
+
+        for process in self.processes.values():
+            process.wait()
+        logger.info("All workers stopped")
+
+
+if __name__ == "__main__":
+    setup_logging()
+    parser = argparse.ArgumentParser(description="Run Monday as several sharded worker processes")
+    parser.add_argument("script", nargs="?", default="monday_bot.py", help="bot script each worker runs")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shard-count", default="auto",
+                        help="total shards, or 'auto' to ask Discord (needs DISCORD_TOKEN)")
+    args = parser.parse_args()
+
+    if args.shard_count == "auto":
+        shard_count = recommended_shard_count(os.environ["DISCORD_TOKEN"])
+    else:
+        shard_count = int(args.shard_count)
+    shard_count = max(shard_count, 1)
+    logger.info(f"Running {shard_count} shards across {min(args.processes, shard_count)} processes")
+    Launcher(args.script, split_shards(shard_count, args.processes), shard_count).run()
@@ -0,0 +1,292 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+
+DEFAULT_STATE_PATH = "monday_state.db"
+DEFAULT_FLUSH_INTERVAL = 5.0
+DEFAULT_KEEP_DAYS = 7
+DEFAULT_WORKER_MAX_AGE = 60
+WORKER_PREFIX = "worker:"
+
+SCOPE_GLOBAL = "global"
+SCOPE_GUILD = "guild"
+SCOPE_USER = "user"
+LIFETIME = ""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS counters (
+    scope TEXT NOT NULL,
+    scope_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    day TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (scope, scope_id, name, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS kv (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def today():
+    """Counters roll over at UTC midnight"""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+# =============================================================================
+# STATE STORE
+# =============================================================================
+
+class StateStore:
+    """Per-guild and per-user counters kept in memory and written behind to SQLite.
+
+    Commands only ever touch the in-memory dicts. Changes are collected as
+    deltas and flushed in one transaction every ``flush_interval`` seconds
+    from a worker thread, so a hot command never waits on disk and a crash
+    loses at most one interval of counts. On startup, today's and lifetime
+    counters are loaded back from the database (WAL mode), except per-user
+    lifetime counters: one per user ever seen would grow without bound, so
+    they are only written behind and ``user(..., daily=False)`` reads them
+    from the database when asked.
+
+    Daily counters are keyed by UTC date, so a new day starts from zero on
+    its own; ``prune`` only drops days older than ``keep_days``, and runs
+    with the first flush of each UTC day.
+
+    Several bot processes can share one database file. After each flush the
+    global and guild counters are re-read, so every process sees totals for
+    the whole cluster, and ``publish_worker``/``cluster_stats`` let workers
+    share a snapshot of their in-memory stats.
+    """
+
+    def __init__(self, path=DEFAULT_STATE_PATH, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 keep_days=DEFAULT_KEEP_DAYS):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.keep_days = keep_days
+        # (scope, scope_id, name, day) -> value
+        self.counters = {}
+        self.values = {}
+        self._pending = {}
+        self._pending_values = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._task = None
+        self._pruned_day = None
+
+        # Another worker process may hold the write lock for a moment
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._recover()
+
+    def _recover(self):
+        rows = self._conn.execute(
+            "SELECT scope, scope_id, name, day, value FROM counters "
+            "WHERE day = ? OR (day = ? AND scope != ?)",
+            (today(), LIFETIME, SCOPE_USER)
+        ).fetchall()
+        for scope, scope_id, name, day, value in rows:
+            self.counters[(scope, scope_id, name, day)] = value
+        for key, value in self._conn.execute("SELECT key, value FROM kv"):
+            self.values[key] = json.loads(value)
+        logger.info(f"Recovered {len(rows)} counters and {len(self.values)} values from {self.path}")
+
+    def refresh(self):
+        """Re-read cluster-wide global/guild counters and worker stats (blocking)"""
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT scope, scope_id, name, day, value FROM counters "
+                "WHERE scope IN (?, ?) AND day IN (?, ?)",
+                (SCOPE_GLOBAL, SCOPE_GUILD, today(), LIFETIME)
+            ).fetchall()
+            workers = self._conn.execute(
+                "SELECT key, value FROM kv WHERE key LIKE ?", (WORKER_PREFIX + "%",)
+            ).fetchall()
+
+        with self._lock:
+            refreshed = {key: value for key, value in self.counters.items() if key[0] == SCOPE_USER}
+            for scope, scope_id, name, day, value in rows:
+                refreshed[(scope, scope_id, name, day)] = value
+            # Increments made since the flush aren't in the database yet
+            for key, delta in self._pending.items():
+                if key[0] != SCOPE_USER:
+                    refreshed[key] = refreshed.get(key, 0) + delta
+            self.counters = refreshed
+            for key, value in workers:
+                if key not in self._pending_values:
+                    self.values[key] = json.loads(value)
+
+    # -------------------------------------------------------------------------
+    # Counters
+    # -------------------------------------------------------------------------
+
+    def _add(self, key, amount, resident=True):
+        with self._lock:
+            if resident:
+                self.counters[key] = self.counters.get(key, 0) + amount
+            self._pending[key] = self._pending.get(key, 0) + amount
+
+    def _read(self, key):
+        """A counter that isn't kept in memory: its stored value plus unflushed deltas (blocking)"""
+        # Holding the database lock keeps a flush from moving deltas between the two reads
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT value FROM counters WHERE scope = ? AND scope_id = ? AND name = ? AND day = ?", key
+            ).fetchone()
+            with self._lock:
+                pending = self._pending.get(key, 0)
+        return (row[0] if row else 0) + pending
+
+    def incr(self, name, guild_id=None, user_id=None, amount=1):
+        """Count one event today and over the bot's lifetime, globally and per guild/user"""
+        day = today()
+        scopes = [(SCOPE_GLOBAL, "")]
+        if guild_id is not None:
+            scopes.append((SCOPE_GUILD, str(guild_id)))
+        if user_id is not None:
+            scopes.append((SCOPE_USER, str(user_id)))
+        for scope, scope_id in scopes:
+            self._add((scope, scope_id, name, day), amount)
+            self._add((scope, scope_id, name, LIFETIME), amount, resident=scope != SCOPE_USER)
+
+    def get(self, name, scope=SCOPE_GLOBAL, scope_id="", daily=True):
+        """A counter's value; a user's lifetime count is read from the database (blocking)"""
+        key = (scope, str(scope_id), name, today() if daily else LIFETIME)
+        if scope == SCOPE_USER and not daily:
+            return self._read(key)
+        return self.counters.get(key, 0)
+
+    def guild(self, name, guild_id, daily=True):
+        return self.get(name, SCOPE_GUILD, guild_id, daily)
+
+    def user(self, name, user_id, daily=True):
+        return self.get(name, SCOPE_USER, user_id, daily)
+
+    # -------------------------------------------------------------------------
+    # Values
+    # -------------------------------------------------------------------------
+
+    def set_value(self, key, value):
+        """Store a small JSON-serialisable value (mood, timestamps...)"""
+        self.values[key] = value
+        with self._lock:
+            self._pending_values[key] = value
+
+    def get_value(self, key, default=None):
+        return self.values.get(key, default)
+
+    def publish_worker(self, worker_id, stats):
+        """Share this process's stats with the rest of the cluster"""
+        self.set_value(f"{WORKER_PREFIX}{worker_id}", dict(stats, updated=time.time()))
+
+    def cluster_stats(self, max_age=DEFAULT_WORKER_MAX_AGE):
+        """Sum of numeric stats over workers that reported recently, plus a worker count"""
+        totals = {"workers": 0}
+        cutoff = time.time() - max_age
+        for key, stats in list(self.values.items()):
+            if not key.startswith(WORKER_PREFIX) or stats.get("updated", 0) < cutoff:
+                continue
+            totals["workers"] += 1
+            for name, value in stats.items():
+                if name != "updated" and isinstance(value, (int, float)):
+                    totals[name] = totals.get(name, 0) + value
+        return totals
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def flush(self):
+        """Write pending deltas in one transaction (blocking; run off the event loop)"""
+        with self._db_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                pending_values, self._pending_values = self._pending_values, {}
+            if not pending and not pending_values:
+                return 0
+
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT INTO counters (scope, scope_id, name, day, value) VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT (scope, scope_id, name, day) DO UPDATE SET value = value + excluded.value",
+                        [key + (delta,) for key, delta in pending.items()]
+                    )
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)",
+                        [(key, json.dumps(value)) for key, value in pending_values.items()]
+                    )
+            except sqlite3.Error:
+                # Put the deltas back so the next flush retries them
+                with self._lock:
+                    for key, delta in pending.items():
+                        self._pending[key] = self._pending.get(key, 0) + delta
+                    for key, value in pending_values.items():
+                        self._pending_values.setdefault(key, value)
+                raise
+        return len(pending) + len(pending_values)
+
+    def prune(self):
+        """Forget daily counters older than ``keep_days``, in memory and on disk"""
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=self.keep_days)).strftime("%Y-%m-%d")
+        current = today()
+        with self._lock:
+            for key in [key for key in self.counters if key[3] not in (LIFETIME, current)]:
+                del self.counters[key]
+        with self._db_lock, self._conn:
+            removed = self._conn.execute(
+                "DELETE FROM counters WHERE day != ? AND day < ?", (LIFETIME, cutoff)
+            ).rowcount
+        return removed
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await asyncio.to_thread(self._flush_and_refresh)
+            except Exception as e:
+                logger.error(f"State flush failed: {e}")
+
+    def _flush_and_refresh(self):
+        self.flush()
+        self.refresh()
+        if self._pruned_day != today():
+            self._pruned_day = today()
+            removed = self.prune()
+            logger.info(f"Daily cleanup removed {removed} old counters - Monday is fresh and ready to be sarcastic again")
+
+    def start(self):
+        """Start the write-behind task (safe to call on every on_ready)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+
+    def close(self):
+        """Flush whatever is left and close the database"""
+        if self._task is not None:
+            self._task.cancel()
+        try:
+            self.flush()
+        finally:
+            self._conn.close()
+
+
+def create_state_store(settings=None):
+    """Build a StateStore from the bot_settings dict"""
+    settings = settings or {}
+    return StateStore(
+        path=settings.get("state_path", DEFAULT_STATE_PATH),
+        flush_interval=settings.get("state_flush_interval", DEFAULT_FLUSH_INTERVAL),
+        keep_days=settings.get("state_keep_days", DEFAULT_KEEP_DAYS)
+    )
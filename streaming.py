@@ -0,0 +1,63 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# DEFAULTS
+# =============================================================================
+
+DISCORD_MESSAGE_LIMIT = 2000
+# Discord allows roughly five edits per five seconds on a message
+DEFAULT_EDIT_INTERVAL = 1.0
+PLACEHOLDER = "*sighs and starts typing...*"
+TYPING_SUFFIX = " ..."
+
+# =============================================================================
+# STREAMING REPLIES
+# =============================================================================
+
+def fit_message(text, suffix=""):
+    """Trim ``text`` so that ``text + suffix`` fits in one Discord message"""
+    room = DISCORD_MESSAGE_LIMIT - len(suffix)
+    if len(text) > room:
+        text = text[:room - 1] + "…"
+    return f"{text}{suffix}"
+
+
+async def stream_reply(ctx, chunks, signature, edit_interval=DEFAULT_EDIT_INTERVAL,
+                       placeholder=PLACEHOLDER):
+    """Post a placeholder reply and edit it in place as ``chunks`` arrive.
+
+    Edits are coalesced to at most one per ``edit_interval`` seconds; the
+    signature is only added on the final edit. Returns the full reply text
+    without the signature. If the stream fails the placeholder is deleted
+    and the error re-raised, so the caller can reply as it normally would.
+    """
+    message = await ctx.reply(placeholder)
+    parts = []
+    shown = placeholder
+    last_edit = time.monotonic()
+
+    try:
+        async for chunk in chunks:
+            parts.append(chunk)
+            now = time.monotonic()
+            if now - last_edit < edit_interval:
+                continue
+
+            content = fit_message("".join(parts).strip(), TYPING_SUFFIX)
+            if content != shown:
+                await message.edit(content=content)
+                shown = content
+                last_edit = now
+    except BaseException:
+        try:
+            await message.delete()
+        except Exception as e:
+            logger.warning(f"Could not delete streaming placeholder: {e}")
+        raise
+
+    text = "".join(parts).strip()
+    await message.edit(content=fit_message(text, signature))
+    return text